@@ -6,9 +6,13 @@ import os
 import sys
 import getpass
 import logging
+from itertools import islice
 
 from apis.rest_client import REST_API_Client
 from apis.rate_limiter import RateLimiter, rate_limited
+from apis.response_cache import Response_Cache, cached, MINUTE, HOUR, DAY
+from apis.market_calendar import Market_Calendar
+from apis.symbol_master import Symbol_Master
 
 logging.basicConfig(level=logging.INFO, format="%(message)s")
 log = logging.getLogger(__name__)
@@ -22,9 +26,13 @@ class Finnhub_REST_API_Client(REST_API_Client):
                  base=None,
                  user=getpass.getuser(),
                  rate_limit=50,
-                 rate_window=60):
+                 rate_window=60,
+                 pool_maxsize=10,
+                 cache_ttls=None,
+                 quote_ttl_open=5,
+                 symbols_refresh=DAY):
 
-        super().__init__(url, api_ver, base, user)
+        super().__init__(url, api_ver, base, user, pool_maxsize=pool_maxsize)
 
         self.API_KEY = os.getenv('FINNHUB_API_KEY', None)
         if not self.API_KEY:
@@ -38,7 +46,16 @@ class Finnhub_REST_API_Client(REST_API_Client):
             user_id=user
         )
 
+        self.cache = Response_Cache(namespace="finnhub", ttl_overrides=cache_ttls)
 
+        # quotes are cached for seconds while the market is open, until the next open while closed
+        self.market_calendar = Market_Calendar(self, open_ttl=quote_ttl_open)
+
+        # daily local copy of the exchange symbol lists, for in-process symbol search
+        self.symbol_master = Symbol_Master(self, refresh_interval=symbols_refresh)
+
+
+    @cached("symbol_lookup", ttl=DAY, negative_ttl=HOUR)
     @rate_limited
     def symbol_lookup(self, query):
 
@@ -70,6 +87,17 @@ class Finnhub_REST_API_Client(REST_API_Client):
         return self.request("GET", url, params=params)
 
 
+    @rate_limited
+    def stock_symbols_iter(self, exchange="US", currency="USD"):
+        """Like stock_symbols, but returns (True, iterator) yielding the symbols as they are parsed."""
+
+        url = f"{self.baseurl}/stock/symbol"
+        params = {"exchange": exchange, "currency": currency, "token": self.API_KEY}
+
+        return self.request_items("GET", url, params=params)
+
+
+    @cached("market_status", ttl=MINUTE)
     @rate_limited
     def market_status(self, exchange="US"):
 
@@ -79,6 +107,7 @@ class Finnhub_REST_API_Client(REST_API_Client):
         return self.request("GET", url, params=params)
 
 
+    @cached("market_holiday", ttl=DAY, stale_ttl=DAY)
     @rate_limited
     def market_holiday(self, exchange="US"):
 
@@ -88,6 +117,7 @@ class Finnhub_REST_API_Client(REST_API_Client):
         return self.request("GET", url, params=params)
 
 
+    @cached("company_profile2", ttl=DAY, stale_ttl=DAY)
     @rate_limited
     def company_profile2(self, symbol):
 
@@ -97,6 +127,7 @@ class Finnhub_REST_API_Client(REST_API_Client):
         return self.request("GET", url, params=params)
 
 
+    @cached("company_peers", ttl=DAY, stale_ttl=DAY)
     @rate_limited
     def company_peers(self, symbol):
 
@@ -106,15 +137,31 @@ class Finnhub_REST_API_Client(REST_API_Client):
         return self.request("GET", url, params=params)
 
 
+    @cached("company_basic_financials", ttl=HOUR, stale_ttl=DAY)
     @rate_limited
-    def company_basic_financials(self, symbol, metric="all"):
+    def company_basic_financials(self, symbol, metric="all", series=True):
+        """
+        :param series: False to leave out the (large) historical 'series'
+                       section; it is then skipped while streaming the response
+        """
 
         url = f"{self.baseurl}/stock/metric"
         params = {"symbol": symbol, "metric": metric, "token": self.API_KEY}
 
-        return self.request("GET", url, params=params)
+        if series:
+            return self.request("GET", url, params=params)
+
+        status, items = self.request_items("GET", url, skip_keys=("series",), params=params)
+        if not status:
+            return False, items
+
+        try:
+            return True, dict(items)
+        except Exception as E:
+            return False, f'Error while decoding content: {E}'
 
 
+    @cached("stock_insider_transactions", ttl=HOUR)
     @rate_limited
     def stock_insider_transactions(self, symbol, from_date=None, to_date=None):
 
@@ -133,15 +180,32 @@ class Finnhub_REST_API_Client(REST_API_Client):
         return True, result
 
 
+    @cached("financials_reported", ttl=DAY)
     @rate_limited
-    def financials_reported(self, symbol, freq="annual"):
+    def financials_reported(self, symbol, freq="annual", max_reports=None):
+        """
+        :param max_reports: keep only the first (most recent) reports; the rest
+                            of the response is not read
+        """
 
         url = f"{self.baseurl}/stock/financials-reported"
         params = {"symbol": symbol, "freq": freq, "token": self.API_KEY}
 
-        return self.request("GET", url, params=params)
+        status, items = self.request_items("GET", url, path=("data",), params=params)
+        if not status:
+            return False, items
 
+        try:
+            reports = list(islice(items, max_reports))
+        except Exception as E:
+            return False, f'Error while decoding content: {E}'
+        finally:
+            items.close()
 
+        return True, {"cik": reports[0].get("cik") if reports else None, "symbol": symbol, "data": reports}
+
+
+    @cached("filings", ttl=6 * HOUR)
     @rate_limited
     def filings(self, symbol, from_date=None, to_date=None):
 
@@ -151,6 +215,7 @@ class Finnhub_REST_API_Client(REST_API_Client):
         return self.request("GET", url, params=params)
 
 
+    @cached("recommendation_trends", ttl=6 * HOUR)
     @rate_limited
     def recommendation_trends(self, symbol):
 
@@ -164,6 +229,7 @@ class Finnhub_REST_API_Client(REST_API_Client):
     ##### News #####
     ################
 
+    @cached("market_news", ttl=5 * MINUTE)
     @rate_limited
     def market_news(self, category="general", min_id=0):
 
@@ -173,6 +239,7 @@ class Finnhub_REST_API_Client(REST_API_Client):
         return self.request("GET", url, params=params)
 
 
+    @cached("company_news", ttl=15 * MINUTE)
     @rate_limited
     def company_news(self, symbol, from_date, to_date):
 
@@ -186,6 +253,7 @@ class Finnhub_REST_API_Client(REST_API_Client):
     ##### Other #####
     #################
 
+    @cached("ipo_calendar", ttl=HOUR)
     @rate_limited
     def ipo_calendar(self, from_date, to_date):
 
@@ -204,6 +272,7 @@ class Finnhub_REST_API_Client(REST_API_Client):
         return True, result
 
 
+    @cached("quote", ttl=lambda self, symbol: self.market_calendar.quote_ttl_of(symbol))
     @rate_limited
     def quote(self, symbol):
 
@@ -213,10 +282,17 @@ class Finnhub_REST_API_Client(REST_API_Client):
         return self.request("GET", url, params=params)
 
 
+    def cached_quote(self, symbol):
+        """Fresh cached quote of a symbol as (status, output), or None (no upstream call)."""
+
+        return type(self).quote.peek(self, symbol)
+
+
     ##################
     ##### Crypto #####
     ##################
 
+    @cached("crypto_exchanges", ttl=DAY, stale_ttl=DAY)
     @rate_limited
     def crypto_exchanges(self):
 
@@ -0,0 +1,146 @@
+import os
+import re
+import json
+import time
+import logging
+import threading
+
+log = logging.getLogger(__name__)
+
+data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+
+class Geocode_Store():
+    """
+    Persistent city -> (lat, lon) store kept in a JSON file on local disk.
+
+    Coordinates of a city do not change, so entries never expire unless a
+    ttl is given. The whole store is held in memory and the file is
+    rewritten (atomically) when a new city is added.
+    """
+
+    def __init__(self, path=None, ttl=None):
+        """
+        :param path: JSON file of the store (default: data/geocode.json)
+        :param ttl: optional expiry of an entry, in seconds (None = never)
+        """
+
+        self.path = path or os.path.join(data_dir, "geocode.json")
+        self.ttl = ttl
+
+        self.lock = threading.Lock()
+        self.entries = {}
+
+        self.__load()
+
+
+    @staticmethod
+    def normalize_city(city_name):
+        """'  Walnut  Creek , CA ' -> 'walnut creek,ca'"""
+
+        name = re.sub(r"\s+", " ", str(city_name)).strip().casefold()
+        return re.sub(r"\s*,\s*", ",", name)
+
+
+    def lookup(self, city_name):
+        """Return (lat, lon) of the city, or None if unknown (or expired)."""
+
+        key = self.normalize_city(city_name)
+
+        with self.lock:
+            entry = self.entries.get(key)
+
+        if entry is None:
+            return None
+
+        if self.ttl is not None and time.time() - entry["ts"] > self.ttl:
+            return None
+
+        return entry["lat"], entry["lon"]
+
+
+    def store(self, city_name, lat, lon):
+
+        key = self.normalize_city(city_name)
+
+        with self.lock:
+            self.entries[key] = {"lat": lat, "lon": lon, "ts": int(time.time())}
+            self.__save()
+
+
+    def warm_from_file(self, path):
+        """
+        Load coordinates from a file, either JSON ({"city": [lat, lon], ...})
+        or one 'city,lat,lon' per line (the city name may contain commas).
+        Returns the number of cities loaded.
+        """
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                content = f.read()
+        except Exception as E:
+            log.error("Geocode_Store: cannot read %s: %s", path, E)
+            return 0
+
+        rows = []
+
+        if path.endswith(".json"):
+            try:
+                data = json.loads(content)
+                items = data.items()
+            except (ValueError, AttributeError) as E:
+                log.warning("Geocode_Store: cannot parse %s: %s", path, E)
+                return 0
+            for city, coords in items:
+                try:
+                    lat, lon = coords
+                    rows.append((city, float(lat), float(lon)))
+                except (ValueError, TypeError):
+                    log.warning("Geocode_Store: skipping invalid entry '%s': %s", city, coords)
+        else:
+            for line in content.splitlines():
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                try:
+                    city, lat, lon = line.rsplit(",", 2)
+                    rows.append((city, float(lat), float(lon)))
+                except ValueError:
+                    log.warning("Geocode_Store: skipping invalid line '%s'", line)
+
+        now = int(time.time())
+
+        with self.lock:
+            for city, lat, lon in rows:
+                self.entries[self.normalize_city(city)] = {"lat": lat, "lon": lon, "ts": now}
+            self.__save()
+
+        log.info("Geocode_Store: loaded %d cities from %s", len(rows), path)
+        return len(rows)
+
+
+    def __load(self):
+
+        if not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except Exception as E:
+            log.error("Geocode_Store: cannot load %s: %s", self.path, E)
+            self.entries = {}
+
+
+    def __save(self):
+
+        # caller holds self.lock
+        tmp_path = f"{self.path}.tmp"
+
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, separators=(",", ":"))
+            os.replace(tmp_path, self.path)
+        except Exception as E:
+            log.error("Geocode_Store: cannot save %s: %s", self.path, E)
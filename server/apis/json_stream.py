@@ -0,0 +1,206 @@
+import re
+import json
+import codecs
+
+WHITESPACE_RE = re.compile(r"[ \t\n\r]*")
+NUMBER_CHARS = set("0123456789.eE+-")
+
+# skipped containers are walked this deep, then decoded (and dropped) piece by piece
+SKIP_LEVELS = 2
+
+
+class JSON_Stream():
+    """
+    Incremental reader of one JSON document arriving in chunks (bytes or str),
+    e.g. response.iter_content() of a streamed HTTP response.
+
+    Only the part of the document being parsed is buffered: items(path)
+    walks down to the container at path, skipping sibling values without
+    building them, and yields its items one at a time. A caller that stops
+    early never reads (or holds) the rest of the document.
+    """
+
+    def __init__(self, chunks):
+
+        self.chunks = iter(chunks)
+        self.utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.decoder = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+
+    def items(self, path=(), skip_keys=()):
+        """
+        Yield the items of the array at path, or the (key, value) pairs of the
+        object at path (except skip_keys, which are skipped without being
+        built). path is a sequence of object keys from the document root;
+        nothing is yielded if a key is missing or its value is not a container.
+        """
+
+        for key in path:
+            if self.__peek() != "{" or not self.__find_key(key):
+                return
+
+        ch = self.__peek()
+
+        if ch == "[":
+            self.pos += 1
+            if self.__peek() == "]":
+                self.pos += 1
+                return
+            while True:
+                yield self.__value()
+                if self.__separator("]"):
+                    return
+
+        elif ch == "{":
+            self.pos += 1
+            if self.__peek() == "}":
+                self.pos += 1
+                return
+            while True:
+                key = self.__value()
+                self.__expect(":")
+                if key in skip_keys:
+                    self.__skip()
+                else:
+                    yield key, self.__value()
+                if self.__separator("}"):
+                    return
+
+
+    def __find_key(self, key):
+        """Position the reader on the value of key in the object starting here."""
+
+        self.pos += 1
+        if self.__peek() == "}":
+            self.pos += 1
+            return False
+
+        while True:
+            name = self.__value()
+            self.__expect(":")
+            if name == key:
+                return True
+            self.__skip()
+            if self.__separator("}"):
+                return False
+
+
+    def __separator(self, close):
+        """Consume ',' (returns False) or the closing bracket (returns True)."""
+
+        ch = self.__peek()
+        self.pos += 1
+
+        if ch == ",":
+            return False
+        if ch == close:
+            return True
+
+        raise ValueError(f"expected ',' or '{close}' at offset {self.pos - 1}, got {ch!r}")
+
+
+    def __expect(self, expected):
+
+        ch = self.__peek()
+        if ch != expected:
+            raise ValueError(f"expected '{expected}', got {ch!r}")
+        self.pos += 1
+
+
+    def __value(self):
+        """Decode the value starting here, reading more chunks until it is complete."""
+
+        self.__peek()
+
+        while True:
+
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+                # a number cut at the end of the buffer may continue in the next chunk
+                complete = isinstance(value, (str, list, dict)) or self.buf[end:end + 1] not in NUMBER_CHARS
+                if self.eof or (end < len(self.buf) and complete):
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+
+            # grow the buffered part geometrically, so a large value is decoded O(1) times
+            pending = len(self.buf) - self.pos
+            while not self.eof and len(self.buf) - self.pos < 2 * pending:
+                self.__fill()
+
+
+    def __skip(self, levels=SKIP_LEVELS):
+        """
+        Move past the value starting here without keeping it. Containers are
+        walked levels deep and decoded piece by piece below that, so only one
+        piece of a large skipped value is held at a time.
+        """
+
+        ch = self.__peek()
+
+        if ch not in "[{" or levels == 0:
+            self.__value()
+            return
+
+        close = "]" if ch == "[" else "}"
+
+        self.pos += 1
+        if self.__peek() == close:
+            self.pos += 1
+            return
+
+        while True:
+            if ch == "{":
+                self.__value()
+                self.__expect(":")
+            self.__skip(levels - 1)
+            if self.__separator(close):
+                return
+
+
+    def __peek(self):
+        """Next non-whitespace character (not consumed)."""
+
+        while True:
+            self.pos = WHITESPACE_RE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.__fill():
+                raise ValueError("unexpected end of document")
+
+
+    def __fill(self):
+        """Append the next chunk to the buffer; False at the end of the document."""
+
+        if self.eof:
+            return False
+
+        try:
+            chunk = next(self.chunks)
+        except StopIteration:
+            chunk = None
+
+        if chunk is None:
+            text = self.utf8.decode(b"", final=True)
+            self.eof = True
+        elif isinstance(chunk, str):
+            text = chunk
+        else:
+            text = self.utf8.decode(chunk)
+
+        # drop what has been parsed already
+        self.buf = self.buf[self.pos:] + text
+        self.pos = 0
+
+        return True
+
+
+def iter_json(chunks, path=(), skip_keys=()):
+    """Shorthand for JSON_Stream(chunks).items(path, skip_keys)."""
+
+    return JSON_Stream(chunks).items(path, skip_keys)
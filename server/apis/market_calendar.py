@@ -0,0 +1,158 @@
+import time
+import logging
+import zoneinfo
+from datetime import datetime, timedelta
+
+log = logging.getLogger(__name__)
+
+
+class Market_Calendar():
+    """
+    Local view of exchange trading hours, used to decide how long a quote
+    may be cached.
+
+    Trading days come from the exchange session hours below minus the
+    holidays of the (cached) Finnhub market_holiday endpoint, so deciding
+    whether the market is open needs no upstream call. Exchanges without
+    known session hours fall back to the (cached) market_status endpoint.
+    """
+
+    # exchange -> (time zone, session start, session end), extended hours included
+    # since quotes keep moving in pre- and post-market trading
+    SESSIONS = {
+        "US": ("America/New_York", (4, 0), (20, 0))
+    }
+
+    # single-letter suffixes of US share classes (BRK.B, BF.A, ...), not exchange codes
+    US_SHARE_CLASSES = {"A", "B", "C"}
+
+    # on early-close days post-market trading ends this long after the close
+    EARLY_CLOSE_POST_MARKET = timedelta(hours=1)
+
+    def __init__(self, client, open_ttl=5, closed_ttl_fallback=60, max_closed_ttl=4 * 24 * 3600):
+        """
+        :param client: Finnhub_REST_API_Client (for market_holiday / market_status)
+        :param open_ttl: quote TTL while the market is open, in seconds
+        :param closed_ttl_fallback: quote TTL while closed, when the next open is unknown
+        :param max_closed_ttl: upper bound of the TTL while closed
+        """
+
+        self.client = client
+        self.open_ttl = open_ttl
+        self.closed_ttl_fallback = closed_ttl_fallback
+        self.max_closed_ttl = max_closed_ttl
+
+
+    def holidays(self, exchange="US"):
+        """{'2025-12-25': '', '2025-11-28': '09:30-13:00', ...}; tradingHour '' means closed all day."""
+
+        try:
+            status, output = self.client.market_holiday(exchange)
+        except Exception as E:
+            status, output = False, str(E)
+
+        if not status or not isinstance(output, dict):
+            log.warning("Market_Calendar: holidays of %s unavailable, assuming none: %s", exchange, output)
+            return {}
+
+        return {h.get("atDate"): h.get("tradingHour") or "" for h in output.get("data", []) if h.get("atDate")}
+
+
+    def state(self, exchange="US", now=None):
+        """
+        Return (is_open, next_change) for an exchange with known session hours,
+        where next_change is the unix time of the next close (when open) or of
+        the next open (when closed). Returns None for other exchanges.
+        """
+
+        session = self.SESSIONS.get(exchange)
+        if session is None:
+            return None
+
+        tz_name, (start_h, start_m), (end_h, end_m) = session
+        tz = zoneinfo.ZoneInfo(tz_name)
+
+        now = time.time() if now is None else now
+        local = datetime.fromtimestamp(now, tz)
+        holidays = self.holidays(exchange)
+
+        for offset in range(14):
+
+            day = (local + timedelta(days=offset)).date()
+            if day.weekday() >= 5:
+                continue
+
+            trading_hour = holidays.get(day.isoformat())
+            if trading_hour == "":
+                continue
+
+            start = datetime(day.year, day.month, day.day, start_h, start_m, tzinfo=tz)
+            end = datetime(day.year, day.month, day.day, end_h, end_m, tzinfo=tz)
+
+            if trading_hour:
+                # early close, e.g. '09:30-13:00'
+                try:
+                    close_h, close_m = (int(x) for x in trading_hour.split("-")[1].split(":"))
+                    end = min(end, datetime(day.year, day.month, day.day, close_h, close_m, tzinfo=tz)
+                              + self.EARLY_CLOSE_POST_MARKET)
+                except (IndexError, ValueError):
+                    pass
+
+            if local < start:
+                return False, start.timestamp()
+            if local < end:
+                return True, end.timestamp()
+
+        return False, None
+
+
+    def quote_ttl(self, exchange="US", now=None):
+        """Seconds a quote may be cached: open_ttl while open, until the next open while closed."""
+
+        now = time.time() if now is None else now
+        state = self.state(exchange, now)
+
+        if state is None:
+            return self.__quote_ttl_from_status(exchange)
+
+        is_open, next_change = state
+
+        if is_open:
+            return self.open_ttl
+
+        if next_change is None:
+            return self.closed_ttl_fallback
+
+        return int(min(max(next_change - now, self.open_ttl), self.max_closed_ttl))
+
+
+    @staticmethod
+    def exchange_of(symbol):
+        """
+        Exchange code of a Finnhub symbol from its suffix: 'AAPL' and share
+        classes such as 'BRK.B' -> 'US', '7203.T' -> 'T', 'RY.TO' -> 'TO'.
+        """
+
+        _, dot, suffix = str(symbol).strip().upper().rpartition(".")
+        if not dot or suffix in Market_Calendar.US_SHARE_CLASSES:
+            return "US"
+        return suffix
+
+
+    def quote_ttl_of(self, symbol, now=None):
+        """quote_ttl of the exchange the symbol is listed on."""
+
+        return self.quote_ttl(self.exchange_of(symbol), now)
+
+
+    def __quote_ttl_from_status(self, exchange):
+
+        try:
+            status, output = self.client.market_status(exchange)
+        except Exception:
+            status, output = False, None
+
+        if status and isinstance(output, dict) and not output.get("isOpen") and not output.get("session"):
+            return self.closed_ttl_fallback
+
+        return self.open_ttl
@@ -8,6 +8,10 @@ import getpass
 import logging
 
 from apis.rest_client import REST_API_Client
+from apis.response_cache import Response_Cache, Negative_Result, cached, MINUTE, HOUR, DAY
+from apis.geocode_store import Geocode_Store
+from apis.weather_history import Weather_History
+from apis.weather_units import CANONICAL_UNIT, UNITS, convert_units
 
 logging.basicConfig(level=logging.INFO, format="%(message)s")
 log = logging.getLogger(__name__)
@@ -19,15 +23,37 @@ class Open_Weather_REST_API_Client(REST_API_Client):
                  url=None,
                  api_ver=None,
                  base=None,
-                 user=getpass.getuser()):
+                 user=getpass.getuser(),
+                 pool_maxsize=10,
+                 cache_ttls=None,
+                 snapshot_ttl=10 * MINUTE,
+                 geocode_file=None,
+                 geocode_warm_file=None,
+                 history_file=None,
+                 history_retention_days=None):
 
-        super().__init__(url, api_ver, base, user)
+        super().__init__(url, api_ver, base, user, pool_maxsize=pool_maxsize)
 
         self.OpenWeather_API_KEY = os.getenv('OpenWeather_API_KEY', None)
         if not self.OpenWeather_API_KEY:
             log.error("OpenWeather_API_KEY environment variable is missing!")
             sys.exit(1)
 
+        # snapshot_ttl: how long one full One Call response serves the current/hourly/daily views
+        cache_ttls = dict({"onecall_snapshot": snapshot_ttl}, **(cache_ttls or {}))
+        self.cache = Response_Cache(namespace="openweather", ttl_overrides=cache_ttls)
+
+        # persistent city -> (lat, lon); coordinates never change
+        self.geocode = Geocode_Store(path=geocode_file)
+
+        geocode_warm_file = geocode_warm_file or os.getenv('GEOCODE_WARM_FILE', None)
+        if geocode_warm_file:
+            self.geocode.warm_from_file(geocode_warm_file)
+
+        # every observation fetched from the upstream is kept locally for range queries
+        history_retention_days = history_retention_days or int(os.getenv('WEATHER_HISTORY_DAYS', '30'))
+        self.history = Weather_History(path=history_file, retention_days=history_retention_days)
+
 
     #############################
     ######### Free-Plan #########
@@ -38,15 +64,28 @@ class Open_Weather_REST_API_Client(REST_API_Client):
         Get current weather data by city_name or city_id or zip_code
         """
 
+        if unit not in UNITS:
+            return False, f"invalid unit '{unit}', expected one of: {', '.join(UNITS)}"
+
         identifiers = [city_name, city_id, zip_code]
         if sum(x is not None for x in identifiers) != 1:
             return False, "You must provide exactly one of: city_name, city_id, or zip_code."
 
+        status, output = self._get_current_weather(city_name, city_id, zip_code)
+        if not status:
+            return False, output
+
+        return True, convert_units(output, unit)
+
+
+    @cached("get_current_weather", ttl=10 * MINUTE, stale_ttl=20 * MINUTE, negative_ttl=HOUR)
+    def _get_current_weather(self, city_name=None, city_id=None, zip_code=None):
+
         url = f"{self.baseurl}/data/2.5/weather"
 
         params = {
             "appid": self.OpenWeather_API_KEY,
-            "units": unit
+            "units": CANONICAL_UNIT
         }
 
         if city_name:
@@ -57,10 +96,12 @@ class Open_Weather_REST_API_Client(REST_API_Client):
             params["zip"] = zip_code
 
         status, output = self.request("GET", url, params=params)
-        if not status:
-            return False, output
 
-        return True, output
+        if status and isinstance(output, dict):
+            self.history.record_current_weather(
+                Weather_History.location_key(city_name, city_id, zip_code), output)
+
+        return status, output
 
 
     def get_forecast_5day_3hour(self, city_name, unit="imperial"):
@@ -68,21 +109,31 @@ class Open_Weather_REST_API_Client(REST_API_Client):
         Get 5-day forecast in 3-hour intervals
         """
 
+        if unit not in UNITS:
+            return False, f"invalid unit '{unit}', expected one of: {', '.join(UNITS)}"
+
+        status, output = self._get_forecast_5day_3hour(city_name)
+        if not status:
+            return False, output
+
+        return True, convert_units(output, unit)
+
+
+    @cached("get_forecast_5day_3hour", ttl=30 * MINUTE, stale_ttl=HOUR, negative_ttl=HOUR)
+    def _get_forecast_5day_3hour(self, city_name):
+
         url = f"{self.baseurl}/data/2.5/forecast"
 
         params = {
             "appid": self.OpenWeather_API_KEY,
             "q": city_name,
-            "units": unit
+            "units": CANONICAL_UNIT
         }
 
-        status, output = self.request("GET", url, params=params)
-        if not status:
-            return False, output
-
-        return True, output
+        return self.request("GET", url, params=params)
 
 
+    @cached("get_city_coordinates", ttl=30 * DAY, negative_ttl=HOUR)
     def get_city_coordinates(self, city_name, limit=1):
         """
         Get lat/lon for a city name
@@ -99,56 +150,168 @@ class Open_Weather_REST_API_Client(REST_API_Client):
         return self.request("GET", url, params=params)
 
 
-    #############################
-    ######### Paid-Plan #########
-    #############################
-
-    def get_onecall_forecast(self, city_name, unit="imperial", exclude="alerts"):
+    def resolve_coordinates(self, city_name):
         """
-        Get current, minutely, hourly, and daily forecast using One Call 3.0.
-        exclude: current, minutely, hourly, daily, alerts
+        Get (lat, lon) for a city name, from the persistent geocode store
+        when known, otherwise from the geocoding API (and remember it)
         """
 
+        coordinates = self.geocode.lookup(city_name)
+        if coordinates:
+            return True, coordinates
+
         status, output = self.get_city_coordinates(city_name)
-        if not status or not output:
+        if not status:
             return False, f"cannot get coordinates of '{city_name}': {output}"
 
+        if not output:
+            # unknown city: the same input will fail the same way
+            return False, Negative_Result(f"cannot get coordinates of '{city_name}': {output}")
+
         if len(output) > 1:
             print(f"More than one coordinates found for '{city_name}'")
 
         lat = output[0].get("lat", None)
         lon = output[0].get("lon", None)
-        if not lat or not lon:
+        if lat is None or lon is None:
             return False, f"lat or lon is missing for city {city_name}"
 
+        self.geocode.store(city_name, lat, lon)
+
+        return True, (lat, lon)
+
+
+    #############################
+    ######### Paid-Plan #########
+    #############################
+
+    def get_onecall_forecast(self, city_name, unit="imperial", exclude="alerts"):
+        """
+        Get current, minutely, hourly, and daily forecast using One Call 3.0.
+        exclude: current, minutely, hourly, daily, alerts
+        """
+
+        if unit not in UNITS:
+            return False, f"invalid unit '{unit}', expected one of: {', '.join(UNITS)}"
+
+        status, output = self._get_onecall_forecast(city_name, exclude)
+        if not status:
+            return False, output
+
+        return True, convert_units(output, unit)
+
+
+    @cached("get_onecall_forecast", ttl=10 * MINUTE, stale_ttl=20 * MINUTE, negative_ttl=HOUR)
+    def _get_onecall_forecast(self, city_name, exclude="alerts"):
+
+        status, output = self.resolve_coordinates(city_name)
+        if not status:
+            return False, output
+
+        lat, lon = output
+
         url = f"{self.baseurl}/data/3.0/onecall"
 
         params = {
             "appid": self.OpenWeather_API_KEY,
             "lat": lat,
             "lon": lon,
-            "units": unit,
+            "units": CANONICAL_UNIT,
             "exclude": exclude
         }
 
         return self.request("GET", url, params=params)
 
 
-    def get_forecast_hourly(self, city_name=None, unit="imperial"):
+    @cached("onecall_snapshot", ttl=10 * MINUTE, stale_ttl=10 * MINUTE)
+    def get_onecall_snapshot(self, lat, lon):
+        """
+        One full One Call 3.0 response (current, hourly and daily) for a position,
+        in CANONICAL_UNIT.
+        The current/hourly/daily views are sliced from this shared snapshot, so
+        asking for several of them downloads One Call once. Expired snapshots
+        are refreshed in a single flight.
+        """
+
+        url = f"{self.baseurl}/data/3.0/onecall"
+
+        params = {
+            "appid": self.OpenWeather_API_KEY,
+            "lat": lat,
+            "lon": lon,
+            "units": CANONICAL_UNIT,
+            "exclude": "minutely,alerts"
+        }
+
+        return self.request("GET", url, params=params)
+
+
+    def get_onecall_view(self, city_name, view, unit="imperial"):
+        """
+        Get one view of the shared One Call snapshot of a city.
+        view: current, hourly, daily
+        """
+
+        if unit not in UNITS:
+            return False, f"invalid unit '{unit}', expected one of: {', '.join(UNITS)}"
 
-        status, output = self.get_onecall_forecast(city_name, unit=unit, exclude="current,minutely,daily,alerts")
+        status, output = self.resolve_coordinates(city_name)
         if not status:
             return False, output
 
-        result = output.get("hourly", [])
-        return True, result
+        lat, lon = output
+
+        status, output = self.get_onecall_snapshot(lat, lon)
+        if not status:
+            return False, output
+
+        if not isinstance(output, dict):
+            return False, f"Unexpected output type: {type(output)}"
+
+        # no-op unless the snapshot holds a new observation
+        self.history.record_onecall(Weather_History.location_key(city_name), output)
+
+        result = output.get(view, {} if view == "current" else [])
+        return True, convert_units(result, unit)
+
+
+    def get_forecast_current(self, city_name=None, unit="imperial"):
+
+        return self.get_onecall_view(city_name, "current", unit=unit)
+
+
+    def get_forecast_hourly(self, city_name=None, unit="imperial"):
+
+        return self.get_onecall_view(city_name, "hourly", unit=unit)
 
 
     def get_forecast_daily(self, city_name=None, unit="imperial"):
 
-        status, output = self.get_onecall_forecast(city_name, unit=unit, exclude="current,minutely,hourly,alerts")
+        return self.get_onecall_view(city_name, "daily", unit=unit)
+
+
+    #############################
+    ######### Prefetch ##########
+    #############################
+
+    def refresh_current_weather(self, city_name):
+        """Fetch the current weather of a city into the cache, even if a fresh entry exists."""
+
+        return type(self)._get_current_weather.refresh(self, city_name=city_name)
+
+
+    def refresh_onecall_snapshot(self, city_name):
+        """Fetch the One Call snapshot of a city into the cache, even if a fresh entry exists."""
+
+        status, output = self.resolve_coordinates(city_name)
         if not status:
             return False, output
 
-        result = output.get("daily", [])
-        return True, result
+        lat, lon = output
+
+        status, output = type(self).get_onecall_snapshot.refresh(self, lat, lon)
+
+        if status and isinstance(output, dict):
+            self.history.record_onecall(Weather_History.location_key(city_name), output)
+
+        return status, output
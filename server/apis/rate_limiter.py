@@ -1,12 +1,91 @@
 
 import sys
 import time
+import uuid
 import redis
+import redis.asyncio as aioredis
+import asyncio
+import inspect
 import logging
+import contextvars
+from contextlib import contextmanager
 from functools import wraps
 
 log = logging.getLogger(__name__)
 
+# Sliding-window admission in a single atomic round trip.
+# KEYS[1] = rate key, ARGV[1] = window (ms), ARGV[2] = max requests, ARGV[3] = unique member.
+# The clock is read on the Redis server, so replicas with skewed clocks
+# competing for the same key still agree on the window.
+# Returns {1, 0} when admitted, or {0, retry_after_ms} when the window is full.
+SLIDING_WINDOW_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local window = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+
+local count = redis.call('ZCARD', KEYS[1])
+if count < limit then
+    redis.call('ZADD', KEYS[1], now, ARGV[3])
+    redis.call('PEXPIRE', KEYS[1], window)
+    return {1, 0}
+end
+
+local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+return {0, math.max(tonumber(oldest[2]) + window - now, 1)}
+"""
+
+# Free slots of the window, without taking one (read-only).
+# KEYS[1] = rate key, ARGV[1] = window (ms), ARGV[2] = max requests.
+# Returns {free_slots, ms_until_the_oldest_slot_frees (0 if none is taken)}.
+REMAINING_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local window = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+
+local count = redis.call('ZCOUNT', KEYS[1], now - window + 1, '+inf')
+local oldest = redis.call('ZRANGEBYSCORE', KEYS[1], now - window + 1, '+inf', 'WITHSCORES', 'LIMIT', 0, 1)
+
+local free_in = 0
+if oldest[2] then
+    free_in = math.max(tonumber(oldest[2]) + window - now, 1)
+end
+
+return {math.max(limit - count, 0), free_in}
+"""
+
+# Per-call override of the fail-fast policy (None = use the decorator default).
+# Set by the tool layer so that the policy can be selected per tool.
+_fail_fast_policy = contextvars.ContextVar("rate_limit_fail_fast", default=None)
+
+
+class RateLimitExceeded(Exception):
+    """Raised in fail-fast mode when the rate limit window is full."""
+
+    def __init__(self, key, retry_after):
+
+        self.key = key
+        self.retry_after = retry_after
+        super().__init__(f"rate limit exceeded for '{key}', retry after {retry_after:.1f} s")
+
+
+@contextmanager
+def rate_limit_policy(fail_fast):
+    """
+    Select the rate limit policy for calls made inside this block.
+    :param fail_fast: True to raise RateLimitExceeded instead of waiting,
+                      False to wait, None to keep the decorator default
+    """
+
+    token = _fail_fast_policy.set(fail_fast)
+    try:
+        yield
+    finally:
+        _fail_fast_policy.reset(token)
+
 
 class RateLimiter:
 
@@ -29,6 +108,10 @@ class RateLimiter:
         self.max_requests = max_requests
         self.interval = interval_seconds
 
+        self.redis_host = redis_host
+        self.redis_port = redis_port
+        self.redis_db = redis_db
+
         self.redis = redis.Redis(
             host=redis_host,
             port=redis_port,
@@ -39,6 +122,13 @@ class RateLimiter:
             log.error("Redis not reachable.")
             sys.exit(1)
 
+        self.window_script = self.redis.register_script(SLIDING_WINDOW_LUA)
+        self.remaining_script = self.redis.register_script(REMAINING_LUA)
+
+        # asyncio client, created on first use inside the event loop
+        self.aredis = None
+        self.async_window_script = None
+
 
     def is_redis_connected(self):
 
@@ -49,33 +139,126 @@ class RateLimiter:
             return False
 
 
-    def acquire(self):
+    def try_acquire(self):
+        """
+        Try to take one slot from the window without waiting.
+        Returns (True, 0) when admitted, otherwise (False, retry_after_seconds).
+        """
+
+        # unique member per request, so bursts within the same
+        # millisecond (or from several replicas) are all counted
+        member = uuid.uuid4().hex
+
+        allowed, retry_ms = self.window_script(keys=[self.key],
+                                               args=[self.interval * 1000, self.max_requests, member])
+
+        if allowed:
+            return True, 0
+
+        return False, int(retry_ms) / 1000.0
+
+
+    def remaining(self):
+        """
+        Return (free_slots, seconds_until_next_slot_frees) of the current
+        window without taking a slot, so callers can plan a batch of requests.
+        """
+
+        free, free_in_ms = self.remaining_script(keys=[self.key],
+                                                 args=[self.interval * 1000, self.max_requests])
+
+        return int(free), int(free_in_ms) / 1000.0
+
+
+    def acquire(self, fail_fast=False):
+        """
+        Block until a slot is available.
+        In fail-fast mode, raise RateLimitExceeded instead of sleeping.
+        """
+
+        while True:
+
+            allowed, wait_time = self.try_acquire()
+            if allowed:
+                return
+
+            if fail_fast:
+                raise RateLimitExceeded(self.key, wait_time)
+
+            log.warning("[RateLimiter] Rate limit exceeded. Sleeping for %.3f seconds...", wait_time)
+            time.sleep(wait_time)
+
+
+    async def try_acquire_async(self):
+        """Awaitable version of try_acquire()."""
+
+        if self.aredis is None:
+            self.aredis = aioredis.Redis(
+                host=self.redis_host,
+                port=self.redis_port,
+                db=self.redis_db,
+                decode_responses=True)
+            self.async_window_script = self.aredis.register_script(SLIDING_WINDOW_LUA)
+
+        member = uuid.uuid4().hex
+
+        allowed, retry_ms = await self.async_window_script(keys=[self.key],
+                                                           args=[self.interval * 1000, self.max_requests, member])
+
+        if allowed:
+            return True, 0
+
+        return False, int(retry_ms) / 1000.0
+
+
+    async def acquire_async(self, fail_fast=False):
+        """
+        Wait for a slot without blocking the event loop.
+        In fail-fast mode, raise RateLimitExceeded instead of waiting.
+        """
+
+        while True:
+
+            allowed, wait_time = await self.try_acquire_async()
+            if allowed:
+                return
+
+            if fail_fast:
+                raise RateLimitExceeded(self.key, wait_time)
+
+            log.warning("[RateLimiter] Rate limit exceeded. Waiting for %.3f seconds...", wait_time)
+            await asyncio.sleep(wait_time)
+
 
-        now = int(time.time())
+def rate_limited(method=None, *, fail_fast=False):
+    """
+    Decorate a client method (sync or async) so that it takes a slot from
+    self.rate_limiter before running. Can be used as @rate_limited or
+    @rate_limited(fail_fast=True). The policy can be overridden per call
+    with rate_limit_policy().
+    """
 
-        pipe = self.redis.pipeline()
-        pipe.zremrangebyscore(self.key, 0, now - self.interval)
-        pipe.zcard(self.key)
-        pipe.zadd(self.key, {str(now): now})
-        pipe.expire(self.key, self.interval)
-        _, count, _, _ = pipe.execute()
+    def decorate(method):
 
-        if count >= self.max_requests:
+        if inspect.iscoroutinefunction(method):
 
-            oldest = self.redis.zrange(self.key, 0, 0, withscores=True)
+            @wraps(method)
+            async def async_wrapper(self, *args, **kwargs):
+                policy = _fail_fast_policy.get()
+                await self.rate_limiter.acquire_async(fail_fast if policy is None else policy)
+                return await method(self, *args, **kwargs)
 
-            if oldest:
-                wait_time = int(oldest[0][1]) + self.interval - now
-                log.warning(f"[RateLimiter] Rate limit exceeded. Sleeping for {wait_time} seconds...")
-                time.sleep(wait_time)
-                return self.acquire()  # retry after sleep
+            return async_wrapper
 
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            policy = _fail_fast_policy.get()
+            self.rate_limiter.acquire(fail_fast if policy is None else policy)
+            return method(self, *args, **kwargs)
 
-def rate_limited(method):
+        return wrapper
 
-    @wraps(method)
-    def wrapper(self, *args, **kwargs):
-        self.rate_limiter.acquire()
-        return method(self, *args, **kwargs)
+    if method is not None:
+        return decorate(method)
 
-    return wrapper
+    return decorate
@@ -0,0 +1,365 @@
+import json
+import time
+import redis
+import inspect
+import logging
+import threading
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import wraps
+
+from influxdb_exporter import get_exporter
+
+log = logging.getLogger(__name__)
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+# fresh_until: served as is until then; expires_at: served stale (and refreshed) until then
+Cache_Entry = namedtuple("Cache_Entry", ["fresh_until", "expires_at", "ok", "value"])
+
+
+class Negative_Result(str):
+    """
+    Error message of a deterministic upstream failure (unknown city, invalid
+    zone, ...). Retrying the same input gives the same answer, so @cached
+    may keep it for negative_ttl seconds.
+    """
+    pass
+
+
+class Response_Cache():
+    """
+    Two-tier cache for upstream API responses.
+
+    Tier 1 is a bounded in-process LRU; tier 2 is the shared Redis instance
+    (also used by the rate limiter), so entries survive restarts and are
+    shared across server replicas. When Redis is not reachable, the cache
+    keeps working with the in-process tier only.
+
+    Entries past their soft TTL are still served (stale-while-revalidate)
+    while a background worker refreshes them.
+
+    Cached values are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self,
+                 namespace: str,
+                 max_entries: int = 1024,
+                 ttl_overrides: dict = None,
+                 refresh_workers: int = 2,
+                 redis_host: str = "redis_mcp",
+                 redis_port: int = 6379,
+                 redis_db: int = 0):
+        """
+        :param namespace: prefix of the cache keys (e.g. 'finnhub')
+        :param max_entries: capacity of the in-process LRU
+        :param ttl_overrides: optional {endpoint: ttl_seconds} replacing the decorator TTLs
+        :param refresh_workers: threads used for background (stale) refreshes
+        """
+
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.ttl_overrides = ttl_overrides or {}
+
+        self.lock = threading.Lock()
+        self.lru = OrderedDict()
+
+        # per-key locks (with reference counts) for single-flight fetches on a miss
+        self.key_locks = {}
+
+        self.refresh_pool = ThreadPoolExecutor(max_workers=refresh_workers,
+                                               thread_name_prefix=f"cache-refresh-{namespace}")
+        self.refreshing = set()
+
+        self.counters = {
+            "hits_l1": 0,
+            "hits_l2": 0,
+            "hits_stale": 0,
+            "hits_negative": 0,
+            "misses": 0,
+            "evictions": 0,
+            "refreshes": 0
+        }
+
+        self.redis = redis.Redis(
+            host=redis_host,
+            port=redis_port,
+            db=redis_db,
+            socket_timeout=0.5,
+            socket_connect_timeout=0.5,
+            decode_responses=True)
+
+        try:
+            self.redis.ping()
+        except Exception as E:
+            log.warning("Response_Cache(%s): Redis not reachable, using in-process cache only: %s", namespace, E)
+            self.redis = None
+
+
+    def ttl_for(self, endpoint, default):
+
+        return self.ttl_overrides.get(endpoint, default)
+
+
+    def make_key(self, endpoint, params):
+
+        params = json.dumps(params, sort_keys=True, default=str, separators=(",", ":"))
+        return f"cache:{self.namespace}:{endpoint}:{params}"
+
+
+    def get(self, endpoint, key, count_miss=True):
+        """Return the Cache_Entry of key (fresh or stale), or None on a miss."""
+
+        now = time.time()
+
+        with self.lock:
+            entry = self.lru.get(key)
+            if entry is not None:
+                if entry.expires_at > now:
+                    self.lru.move_to_end(key)
+                    self.__count(endpoint, "hits_l1")
+                    self.__count_kind(endpoint, entry, now)
+                    return entry
+                del self.lru[key]
+
+        if self.redis is not None:
+
+            try:
+                payload = self.redis.get(key)
+            except Exception as E:
+                log.debug("Response_Cache(%s): Redis get failed: %s", self.namespace, E)
+                payload = None
+
+            entry = None
+            if payload is not None:
+                try:
+                    entry = self.__decode(payload)
+                except (ValueError, KeyError, TypeError) as E:
+                    # corrupt or foreign value under a cache key: treat as absent
+                    log.debug("Response_Cache(%s): cannot decode %s: %s", self.namespace, key, E)
+
+            if entry is not None:
+                if entry.expires_at > now:
+                    self.__store_l1(key, entry)
+                    with self.lock:
+                        self.__count(endpoint, "hits_l2")
+                        self.__count_kind(endpoint, entry, now)
+                    return entry
+
+        if count_miss:
+            with self.lock:
+                self.__count(endpoint, "misses")
+
+        return None
+
+
+    @contextmanager
+    def single_flight(self, key):
+        """Serialize fetches of the same key, so concurrent misses hit the upstream once."""
+
+        with self.lock:
+            lock, refs = self.key_locks.get(key, (None, 0))
+            if lock is None:
+                lock = threading.Lock()
+            self.key_locks[key] = (lock, refs + 1)
+
+        try:
+            with lock:
+                yield
+        finally:
+            with self.lock:
+                lock, refs = self.key_locks[key]
+                if refs == 1:
+                    del self.key_locks[key]
+                else:
+                    self.key_locks[key] = (lock, refs - 1)
+
+
+    def set(self, endpoint, key, value, ttl, stale_ttl=0, ok=True):
+        """
+        Store value as fresh for ttl seconds, then as stale for stale_ttl more.
+        ok=False stores a (negative) error result.
+        """
+
+        now = time.time()
+        entry = Cache_Entry(now + ttl, now + ttl + stale_ttl, ok, value)
+
+        self.__store_l1(key, entry)
+
+        if self.redis is None:
+            return
+
+        try:
+            payload = json.dumps({"fresh": entry.fresh_until,
+                                  "exp": entry.expires_at,
+                                  "ok": ok,
+                                  "v": value}, default=str)
+            self.redis.set(key, payload, ex=max(int(ttl + stale_ttl), 1))
+        except Exception as E:
+            log.debug("Response_Cache(%s): Redis set failed: %s", self.namespace, E)
+
+
+    def refresh_in_background(self, endpoint, key, fn):
+        """Run fn() on the refresh pool unless key is already being refreshed."""
+
+        with self.lock:
+            if key in self.refreshing:
+                return
+            self.refreshing.add(key)
+            self.__count(endpoint, "refreshes")
+
+        def run():
+            try:
+                fn()
+            except Exception as E:
+                log.warning("Response_Cache(%s): background refresh of %s failed: %s", self.namespace, endpoint, E)
+            finally:
+                with self.lock:
+                    self.refreshing.discard(key)
+
+        self.refresh_pool.submit(run)
+
+
+    def stats(self):
+
+        with self.lock:
+            return dict(self.counters, entries=len(self.lru))
+
+
+    def __decode(self, payload):
+
+        data = json.loads(payload)
+
+        value = data["v"]
+        if not data["ok"] and isinstance(value, str):
+            value = Negative_Result(value)
+
+        return Cache_Entry(float(data["fresh"]), float(data["exp"]), bool(data["ok"]), value)
+
+
+    def __store_l1(self, key, entry):
+
+        with self.lock:
+
+            self.lru[key] = entry
+            self.lru.move_to_end(key)
+
+            while len(self.lru) > self.max_entries:
+                self.lru.popitem(last=False)
+                self.counters["evictions"] += 1
+                get_exporter().incr_counter("mcp_cache", {"namespace": self.namespace}, "evictions")
+
+
+    def __count_kind(self, endpoint, entry, now):
+
+        # caller holds self.lock
+        if not entry.ok:
+            self.__count(endpoint, "hits_negative")
+        elif entry.fresh_until <= now:
+            self.__count(endpoint, "hits_stale")
+
+
+    def __count(self, endpoint, counter):
+
+        # caller holds self.lock
+        self.counters[counter] += 1
+        get_exporter().incr_counter("mcp_cache", {"namespace": self.namespace, "endpoint": endpoint}, counter)
+
+
+def cached(endpoint, ttl, stale_ttl=0, negative_ttl=0):
+    """
+    Cache the results of a client method in self.cache.
+
+    :param ttl: seconds a successful result is served as fresh, or a function
+                ttl(self, *args, **kwargs) of the method arguments returning
+                them when the result is stored
+                (can be overridden per endpoint with Response_Cache(ttl_overrides=...))
+    :param stale_ttl: seconds a result is still served after ttl, while it is
+                      refreshed in the background (stale-while-revalidate)
+    :param negative_ttl: seconds to keep deterministic failures, i.e. a
+                         (False, Negative_Result) or an empty successful result
+
+    Place it above @rate_limited so that cache hits do not take rate limit slots.
+    """
+
+    def decorate(method):
+
+        sig = inspect.signature(method)
+
+        def fetch_and_store(self, key, args, kwargs):
+
+            status, output = method(self, *args, **kwargs)
+
+            entry_ttl = self.cache.ttl_for(endpoint, ttl(self, *args, **kwargs) if callable(ttl) else ttl)
+
+            if status and not output and negative_ttl > 0:
+                self.cache.set(endpoint, key, output, negative_ttl)
+            elif status and entry_ttl > 0:
+                self.cache.set(endpoint, key, output, entry_ttl, stale_ttl)
+            elif not status and isinstance(output, Negative_Result) and negative_ttl > 0:
+                self.cache.set(endpoint, key, output, negative_ttl, ok=False)
+
+            return status, output
+
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+
+            # positional, keyword and default arguments map to the same key
+            bound = sig.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            params = dict(list(bound.arguments.items())[1:])
+
+            key = self.cache.make_key(endpoint, params)
+
+            entry = self.cache.get(endpoint, key)
+            if entry is not None:
+                if entry.ok and entry.fresh_until <= time.time():
+                    self.cache.refresh_in_background(endpoint, key,
+                                                     lambda: fetch_and_store(self, key, args, kwargs))
+                return entry.ok, entry.value
+
+            with self.cache.single_flight(key):
+
+                # another caller may have fetched it while we were waiting
+                entry = self.cache.get(endpoint, key, count_miss=False)
+                if entry is not None:
+                    return entry.ok, entry.value
+
+                return fetch_and_store(self, key, args, kwargs)
+
+        def refresh(self, *args, **kwargs):
+            """Fetch from the upstream and store, ignoring any cached entry (used for prefetching)."""
+
+            bound = sig.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            params = dict(list(bound.arguments.items())[1:])
+
+            key = self.cache.make_key(endpoint, params)
+
+            with self.cache.single_flight(key):
+                return fetch_and_store(self, key, args, kwargs)
+
+        def peek(self, *args, **kwargs):
+            """Return the fresh cached (status, output), or None; never calls the upstream."""
+
+            bound = sig.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            params = dict(list(bound.arguments.items())[1:])
+
+            entry = self.cache.get(endpoint, self.cache.make_key(endpoint, params), count_miss=False)
+            if entry is None or entry.fresh_until <= time.time():
+                return None
+
+            return entry.ok, entry.value
+
+        # Client.method.refresh(client, ...) forces a fetch of the same cache key,
+        # Client.method.peek(client, ...) only looks it up
+        wrapper.refresh = refresh
+        wrapper.peek = peek
+
+        return wrapper
+
+    return decorate
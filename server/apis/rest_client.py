@@ -5,10 +5,17 @@
 import sys
 import json
 import logging
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlsplit
 from dotenv import load_dotenv
 from pathlib import Path
 
+from influxdb_exporter import get_exporter
+from apis.response_cache import Negative_Result
+from apis.json_stream import iter_json
+
 logging.basicConfig(level=logging.INFO, format="%(message)s")
 log = logging.getLogger(__name__)
 
@@ -22,7 +29,13 @@ class REST_API_Client():
                  url,
                  api_ver=None,
                  base=None,
-                 user=None):
+                 user=None,
+                 pool_connections=4,
+                 pool_maxsize=10):
+        """
+        :param pool_connections: number of per-host connection pools to cache
+        :param pool_maxsize: maximum number of keep-alive connections per host
+        """
 
         if not REST_API_Client.__with_http_prefix(url):
             log.error("Invalid url: %s", url)
@@ -43,6 +56,16 @@ class REST_API_Client():
             'accept': 'application/json',
         }
 
+        # one pooled session per client instance, so consecutive calls
+        # to the same upstream reuse the TCP+TLS connection (keep-alive)
+        self.adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session = requests.Session()
+        self.session.mount("http://", self.adapter)
+        self.session.mount("https://", self.adapter)
+
+        self.conn_lock = threading.Lock()
+        self.conn_stats = {}
+
 
     @staticmethod
     def __with_http_prefix(host):
@@ -56,23 +79,70 @@ class REST_API_Client():
         return False
 
 
+    def connection_stats(self):
+        """
+        Per-host connection counters of the pooled session:
+        {host: {"requests": int, "new": int, "reused": int}}
+        """
+
+        with self.conn_lock:
+            return {host: dict(stats) for host, stats in self.conn_stats.items()}
+
+
+    def __update_conn_stats(self, url):
+
+        host = urlsplit(url).hostname
+
+        # urllib3 counts every connection it opens and every request it sends;
+        # a host may have several pools (e.g. one per TLS context)
+        new_conn = 0
+        requests_sent = 0
+
+        pools = self.adapter.poolmanager.pools
+        for key in pools.keys():
+            if key.key_host != host:
+                continue
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            new_conn += pool.num_connections
+            requests_sent += pool.num_requests
+
+        stats = {
+            "requests": requests_sent,
+            "new": new_conn,
+            "reused": max(requests_sent - new_conn, 0)
+        }
+
+        with self.conn_lock:
+            self.conn_stats[host] = stats
+
+        get_exporter().set_gauge("mcp_http_conn", {"host": host}, stats)
+
+
     def request(self, method, url, timeout=10, verify=True, stream=False, decode=True, **kwargs):
 
         try:
-            response = requests.request(method,
-                                        url,
-                                        headers=self.headers,
-                                        timeout=timeout,
-                                        verify=verify,
-                                        stream=stream,
-                                        **kwargs)
+            response = self.session.request(method,
+                                            url,
+                                            headers=self.headers,
+                                            timeout=timeout,
+                                            verify=verify,
+                                            stream=stream,
+                                            **kwargs)
         except Exception as E:
             return False, str(E)
+        finally:
+            self.__update_conn_stats(url)
 
         try:
             response.raise_for_status()
         except Exception as E:
-            return False, f'Return code={response.status_code}, {E}\n{response.text}'
+            message = f'Return code={response.status_code}, {E}\n{response.text}'
+            # bad request / not found: the same input will fail the same way
+            if response.status_code in (400, 404):
+                return False, Negative_Result(message)
+            return False, message
 
         if stream:
             return True, response
@@ -90,3 +160,27 @@ class REST_API_Client():
             return False, f'Error while decoding content: {E}'
 
         return True, data_dict
+
+
+    def request_items(self, method, url, path=(), skip_keys=(), timeout=10, chunk_size=64 * 1024, **kwargs):
+        """
+        Streaming variant of request() for very large JSON bodies.
+
+        Returns (True, iterator) or (False, error). The iterator yields the items
+        of the array at path (or the (key, value) pairs of the object at path,
+        except skip_keys) while they are parsed from the socket, so the body is
+        never held whole. Stopping early (or close()) releases the response;
+        a malformed body raises ValueError while iterating.
+        """
+
+        status, response = self.request(method, url, timeout=timeout, stream=True, **kwargs)
+        if not status:
+            return False, response
+
+        def items():
+            try:
+                yield from iter_json(response.iter_content(chunk_size=chunk_size), path, skip_keys)
+            finally:
+                response.close()
+
+        return True, items()
@@ -0,0 +1,508 @@
+import os
+import re
+import sys
+import time
+import bisect
+import difflib
+import logging
+import threading
+import numpy as np
+
+from apis.geocode_store import data_dir
+
+log = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r"[0-9a-z]+")
+
+DAY = 24 * 3600
+
+
+def tokenize(text):
+    """'Apple Inc.' -> ['apple', 'inc']"""
+
+    return TOKEN_RE.findall(str(text).casefold())
+
+
+class String_Column():
+    """
+    Read-only column of strings kept as one str plus an array of offsets,
+    instead of one Python object per row. Supports len(), [i] and bisect.
+    """
+
+    def __init__(self, blob, offsets):
+
+        self.blob = blob
+        self.offsets = offsets
+
+
+    @classmethod
+    def from_list(cls, values):
+
+        offsets = np.zeros(len(values) + 1, dtype=np.int64)
+        np.cumsum([len(v) for v in values], out=offsets[1:])
+        return cls("".join(values), offsets)
+
+
+    def __len__(self):
+
+        return len(self.offsets) - 1
+
+
+    def __getitem__(self, i):
+
+        return self.blob[self.offsets[i]:self.offsets[i + 1]]
+
+
+    def prefix_range(self, prefix):
+        """(lo, hi) rows starting with prefix, for a column sorted in ascending order."""
+
+        lo = bisect.bisect_left(self, prefix)
+        hi = bisect.bisect_left(self, prefix + "\U0010ffff", lo)
+        return lo, hi
+
+
+class Symbol_Table():
+    """
+    Symbols of one exchange in column form, sorted by symbol.
+
+    - text columns are String_Column objects,
+    - low-cardinality columns (type, currency, mic) are small integer codes
+      into a list of interned values,
+    - description tokens form an inverted index: a sorted token vocabulary
+      (itself a String_Column) with CSR posting lists of row numbers.
+
+    Sorted columns double as a flattened prefix trie: the rows (or tokens)
+    below a trie node are one contiguous range, found by bisection.
+    """
+
+    TEXT_COLUMNS = ("symbol", "displaySymbol", "description", "figi", "shareClassFIGI", "isin")
+    CODE_COLUMNS = ("type", "currency", "mic")
+
+    def __init__(self, exchange, built_at, text, codes, categories, vocab, token_offsets, postings, token_counts):
+
+        self.exchange = exchange
+        self.built_at = float(built_at)
+        self.text = text
+        self.codes = codes
+        self.categories = {name: [sys.intern(str(v)) for v in values] for name, values in categories.items()}
+        self.vocab = vocab
+        self.token_offsets = token_offsets
+        self.postings = postings
+        self.token_counts = token_counts
+
+        self.symbols = self.text["symbol"]
+
+        # global ranking of the rows: common stock first, then primary listings
+        # (no '.' class suffix), short descriptions and short symbols
+        common = self.categories["type"].index("Common Stock") if "Common Stock" in self.categories["type"] else -1
+        not_common = (self.codes["type"] != common).astype(np.int8)
+        dotted = np.array(["." in self.symbols[i] for i in range(len(self))], dtype=np.int8)
+        symbol_len = np.diff(self.symbols.offsets)
+        order = np.lexsort((symbol_len, self.token_counts, dotted, not_common))
+        self.rank = np.empty(len(self), dtype=np.int32)
+        self.rank[order] = np.arange(len(self), dtype=np.int32)
+
+
+    #############################
+    ########## Build ############
+    #############################
+
+    @classmethod
+    def from_records(cls, exchange, records):
+        """Build the table from Finnhub stock/symbol records."""
+
+        t0 = time.perf_counter()
+
+        # columns are filled as records arrive (a streamed list is never held as
+        # dicts), then put in symbol order with one index permutation
+        values = {name: [] for name in cls.TEXT_COLUMNS}
+        raw_codes = {name: [] for name in cls.CODE_COLUMNS}
+        categories = {name: {} for name in cls.CODE_COLUMNS}
+
+        for r in records:
+            if not isinstance(r, dict) or not r.get("symbol"):
+                continue
+            for name in cls.TEXT_COLUMNS:
+                values[name].append(str(r.get(name) or ""))
+            for name in cls.CODE_COLUMNS:
+                raw_codes[name].append(categories[name].setdefault(sys.intern(str(r.get(name) or "")), len(categories[name])))
+
+        symbols = values["symbol"]
+        order = sorted(range(len(symbols)), key=symbols.__getitem__)
+
+        text = {}
+        for name in cls.TEXT_COLUMNS:
+            column = values.pop(name)
+            text[name] = String_Column.from_list([column[i] for i in order])
+
+        codes = {name: np.array(raw_codes[name], dtype=np.uint16)[order] for name in cls.CODE_COLUMNS}
+        categories = {name: list(categories[name]) for name in cls.CODE_COLUMNS}
+
+        descriptions = text["description"]
+        rows = len(order)
+
+        postings_of = {}
+        token_counts = np.zeros(rows, dtype=np.uint8)
+        for i in range(rows):
+            tokens = tokenize(descriptions[i])
+            token_counts[i] = min(len(tokens), 255)
+            for token in set(tokens):
+                postings_of.setdefault(token, []).append(i)
+
+        vocab = sorted(postings_of)
+        token_offsets = np.zeros(len(vocab) + 1, dtype=np.int64)
+        np.cumsum([len(postings_of[t]) for t in vocab], out=token_offsets[1:])
+        postings = np.fromiter((i for t in vocab for i in postings_of[t]), dtype=np.int32, count=int(token_offsets[-1]))
+
+        table = cls(exchange, time.time(), text, codes, categories,
+                    String_Column.from_list(vocab), token_offsets, postings, token_counts)
+
+        log.info("Symbol_Table(%s): %d symbols, %d tokens indexed in %.0f ms",
+                 exchange, len(table), len(vocab), (time.perf_counter() - t0) * 1000)
+
+        return table
+
+
+    #############################
+    ####### Save / Load #########
+    #############################
+
+    def save(self, path):
+
+        arrays = {
+            "exchange": np.array(self.exchange),
+            "built_at": np.array(self.built_at),
+            "token_counts": self.token_counts,
+            "token_offsets": self.token_offsets,
+            "postings": self.postings,
+            "vocab_blob": np.frombuffer(self.vocab.blob.encode("utf-8"), dtype=np.uint8),
+            "vocab_offsets": self.vocab.offsets
+        }
+
+        for name, column in self.text.items():
+            arrays[f"text_{name}_blob"] = np.frombuffer(column.blob.encode("utf-8"), dtype=np.uint8)
+            arrays[f"text_{name}_offsets"] = column.offsets
+
+        for name, column in self.codes.items():
+            arrays[f"code_{name}"] = column
+            arrays[f"categories_{name}"] = np.array(self.categories[name] or [""])
+
+        tmp_path = f"{path}.tmp.npz"
+        np.savez_compressed(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+
+
+    @classmethod
+    def load(cls, path):
+
+        def column(data, prefix):
+            return String_Column(data[f"{prefix}_blob"].tobytes().decode("utf-8"), data[f"{prefix}_offsets"])
+
+        with np.load(path, allow_pickle=False) as data:
+            return cls(str(data["exchange"]),
+                       float(data["built_at"]),
+                       {name: column(data, f"text_{name}") for name in cls.TEXT_COLUMNS},
+                       {name: data[f"code_{name}"] for name in cls.CODE_COLUMNS},
+                       {name: data[f"categories_{name}"].tolist() for name in cls.CODE_COLUMNS},
+                       column(data, "vocab"),
+                       data["token_offsets"],
+                       data["postings"],
+                       data["token_counts"])
+
+
+    #############################
+    ########## Lookup ###########
+    #############################
+
+    def __len__(self):
+
+        return len(self.symbols)
+
+
+    def record(self, row):
+        """Row as a Finnhub stock/symbol record."""
+
+        record = {name: column[row] for name, column in self.text.items()}
+        for name, column in self.codes.items():
+            record[name] = self.categories[name][column[row]]
+        record["isin"] = record["isin"] or None
+        return record
+
+
+    def find_symbol(self, symbol):
+
+        lo, hi = self.symbols.prefix_range(symbol)
+        if lo < hi and self.symbols[lo] == symbol:
+            return lo
+        return None
+
+
+    def token_rows(self, token, prefix=False):
+        """Rows whose description has the token (or a token starting with it)."""
+
+        if prefix:
+            lo, hi = self.vocab.prefix_range(token)
+        else:
+            lo = bisect.bisect_left(self.vocab, token)
+            hi = lo + 1 if lo < len(self.vocab) and self.vocab[lo] == token else lo
+
+        rows = self.postings[self.token_offsets[lo]:self.token_offsets[hi]]
+        return np.unique(rows) if hi - lo > 1 else rows
+
+
+    def match_description(self, tokens, fuzzy=False):
+        """
+        Rows whose description has every token; the last one may be
+        incomplete (prefix match). With fuzzy=True an unknown token is
+        replaced by its closest spellings in the vocabulary.
+        """
+
+        matched = None
+
+        for n, token in enumerate(tokens):
+
+            rows = self.token_rows(token, prefix=(n == len(tokens) - 1))
+
+            if not len(rows) and fuzzy and len(token) >= 3:
+                # typos rarely hit the first letter: only compare tokens sharing it
+                lo, hi = self.vocab.prefix_range(token[0])
+                close = difflib.get_close_matches(token, [self.vocab[i] for i in range(lo, hi)], n=3, cutoff=0.8)
+                if close:
+                    rows = np.unique(np.concatenate([self.token_rows(t) for t in close]))
+
+            matched = rows if matched is None else np.intersect1d(matched, rows, assume_unique=True)
+            if not len(matched):
+                break
+
+        return matched if matched is not None else np.zeros(0, dtype=np.int32)
+
+
+    def search(self, query, limit=10):
+        """
+        Rows best matching a free-text query: the exact symbol first, then
+        description matches, then symbols starting with the query, then
+        descriptions matching a close spelling of the query.
+        """
+
+        text = str(query).strip()
+        if not text:
+            return []
+
+        rows = []
+
+        def add(candidates):
+            ranked = candidates[np.argsort(self.rank[candidates], kind="stable")]
+            rows.extend(ranked[:limit].tolist() if limit is not None else ranked.tolist())
+
+        def full():
+            return limit is not None and len(rows) >= limit
+
+        row = self.find_symbol(text.upper())
+        if row is not None:
+            rows.append(row)
+
+        tokens = tokenize(text)
+
+        if not full():
+            add(self.match_description(tokens))
+
+        if not full():
+            lo, hi = self.symbols.prefix_range(text.upper())
+            add(np.arange(lo, hi))
+
+        if not rows:
+            add(self.match_description(tokens, fuzzy=True))
+
+        rows = list(dict.fromkeys(rows))
+        return rows if limit is None else rows[:limit]
+
+
+    def select(self, currency=None, security_type=None, query=None, limit=5):
+        """
+        Return (total, rows) of the symbols matching all the given filters;
+        rows holds the first limit of them (best query matches first).
+        """
+
+        mask = np.ones(len(self), dtype=bool)
+
+        for name, value in (("currency", currency), ("type", security_type)):
+            if not value:
+                continue
+            wanted = np.array([v.casefold() == str(value).casefold() for v in self.categories[name]])
+            if not wanted.any():
+                return 0, []
+            mask &= wanted[self.codes[name]]
+
+        if query:
+            rows = np.array(self.search(query, limit=None), dtype=np.int64)
+            rows = rows[mask[rows]]
+        else:
+            rows = np.flatnonzero(mask)
+
+        return len(rows), rows[:limit].tolist()
+
+
+class Symbol_Master():
+    """
+    Local copy of the Finnhub symbol list of each exchange, used to answer
+    symbol searches and symbol listings in-process.
+
+    A table is downloaded on first use of its exchange, or at startup with
+    warm() (one upstream call), saved under data/ so restarts start from disk, and rebuilt in the
+    background once it is older than refresh_interval. Callers fall back
+    to the upstream API when no table is available (None is returned).
+    """
+
+    # after a failed download, the upstream is not asked again for this long
+    RETRY_AFTER_FAILURE = 300
+
+    def __init__(self, client, path=None, refresh_interval=DAY):
+        """
+        :param client: Finnhub_REST_API_Client (for stock_symbols)
+        :param path: directory of the saved tables (default: data/)
+        :param refresh_interval: age in seconds after which a table is rebuilt
+        """
+
+        self.client = client
+        self.path = path or data_dir
+        self.refresh_interval = refresh_interval
+
+        self.lock = threading.Lock()
+        self.tables = {}
+        self.refreshing = set()
+        self.failed_at = {}
+
+        # held while a table is first loaded, so a list is downloaded once
+        self.load_lock = threading.Lock()
+
+
+    def table(self, exchange="US"):
+
+        exchange = str(exchange).strip().upper()
+
+        with self.lock:
+            table = self.tables.get(exchange)
+
+        if table is None:
+            # another thread is loading: answer from the upstream meanwhile rather than wait
+            if not self.load_lock.acquire(blocking=False):
+                return None
+            try:
+                with self.lock:
+                    table = self.tables.get(exchange)
+                    failed_at = self.failed_at.get(exchange, 0)
+                if table is None:
+                    table = self.__load(exchange)
+                if table is None and time.time() - failed_at > self.RETRY_AFTER_FAILURE:
+                    table = self.refresh(exchange)
+            finally:
+                self.load_lock.release()
+
+        if table is not None and time.time() - table.built_at > self.refresh_interval:
+            self.__refresh_in_background(exchange)
+
+        return table
+
+
+    def warm(self, exchange="US"):
+        """
+        Load (or download and index) the table of an exchange in the background.
+        Otherwise the first search of an exchange does it on the caller's
+        thread. Searches arriving while a table loads get None (and fall back
+        to the upstream) instead of waiting for it.
+        """
+
+        threading.Thread(target=self.table, args=(exchange,), name=f"symbol-master-warm-{exchange}", daemon=True).start()
+
+
+    def search(self, query, exchange="US", limit=10):
+        """Best matching records for a free-text query, or None if the symbol list is unavailable."""
+
+        table = self.table(exchange)
+        if table is None:
+            return None
+
+        return [table.record(row) for row in table.search(query, limit=limit)]
+
+
+    def select(self, exchange="US", currency=None, security_type=None, query=None, limit=5):
+        """(total, records) of the symbols matching the filters, or None if the symbol list is unavailable."""
+
+        table = self.table(exchange)
+        if table is None:
+            return None
+
+        total, rows = table.select(currency=currency, security_type=security_type, query=query, limit=limit)
+        return total, [table.record(row) for row in rows]
+
+
+    def refresh(self, exchange="US"):
+        """Download the symbol list of an exchange and rebuild its table."""
+
+        # the list is parsed while it downloads, without holding the whole body
+        try:
+            status, output = self.client.stock_symbols_iter(exchange, currency=None)
+            table = Symbol_Table.from_records(exchange, output) if status else None
+        except Exception as E:
+            status, output, table = False, str(E), None
+
+        if table is None or not len(table):
+            reason = "empty symbol list" if status else str(output)[:200]
+            log.warning("Symbol_Master: cannot download the symbols of %s: %s", exchange, reason)
+            with self.lock:
+                self.failed_at[exchange] = time.time()
+            return None
+
+        with self.lock:
+            self.tables[exchange] = table
+
+        try:
+            table.save(self.__file(exchange))
+        except Exception as E:
+            log.warning("Symbol_Master: cannot save the symbols of %s: %s", exchange, E)
+
+        return table
+
+
+    def __refresh_in_background(self, exchange):
+
+        with self.lock:
+            if exchange in self.refreshing:
+                return
+            self.refreshing.add(exchange)
+
+        def run():
+            try:
+                self.refresh(exchange)
+            finally:
+                with self.lock:
+                    self.refreshing.discard(exchange)
+
+        threading.Thread(target=run, name=f"symbol-master-{exchange}", daemon=True).start()
+
+
+    def __file(self, exchange):
+
+        return os.path.join(self.path, f"symbols_{re.sub(r'[^0-9A-Z_]', '_', exchange)}.npz")
+
+
+    def __load(self, exchange):
+
+        path = self.__file(exchange)
+        if not os.path.exists(path):
+            return None
+
+        t0 = time.perf_counter()
+
+        try:
+            table = Symbol_Table.load(path)
+        except Exception as E:
+            log.warning("Symbol_Master: cannot load %s: %s", path, E)
+            return None
+
+        log.info("Symbol_Master: loaded %d symbols of %s in %.0f ms", len(table), exchange, (time.perf_counter() - t0) * 1000)
+
+        with self.lock:
+            self.tables[exchange] = table
+
+        return table
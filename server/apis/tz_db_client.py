@@ -4,10 +4,14 @@
 
 import os
 import sys
+import time
 import getpass
 import logging
 
 from apis.rest_client import REST_API_Client
+from apis.response_cache import Response_Cache, Negative_Result, cached, HOUR, DAY
+from apis.tz_local import get_local_resolver
+from apis.tz_geo import load_geo_index
 
 logging.basicConfig(level=logging.INFO, format="%(message)s")
 log = logging.getLogger(__name__)
@@ -19,18 +23,48 @@ class TZ_DB_REST_API_Client(REST_API_Client):
                  url=None,
                  api_ver=None,
                  base=None,
-                 user=getpass.getuser()):
+                 user=getpass.getuser(),
+                 pool_maxsize=10,
+                 cache_ttls=None,
+                 resolve_locally=True,
+                 boundary_file=None):
 
-        super().__init__(url, api_ver, base, user)
+        super().__init__(url, api_ver, base, user, pool_maxsize=pool_maxsize)
 
         self.TimeZoneDB_API_KEY = os.getenv('TimeZoneDB_API_KEY', None)
         if not self.TimeZoneDB_API_KEY:
             log.error("TimeZoneDB_API_KEY environment variable is missing!")
             sys.exit(1)
 
+        self.cache = Response_Cache(namespace="timezonedb", ttl_overrides=cache_ttls)
+
+        # answer what the IANA database can answer without calling TimeZoneDB
+        self.local = get_local_resolver() if resolve_locally else None
+
+        # point-in-polygon index of the time zone boundaries (None if no boundary file)
+        self.geo = load_geo_index(boundary_file) if resolve_locally else None
+
 
     def list_timezone(self, country_code=None, zone_name=None):
 
+        # served from the local zone index, unless the local tzdata tables are missing
+        if self.local is not None and self.local.listed_zones:
+            return True, self.local.list_zones(country_code=country_code, zone_name=zone_name)
+
+        status, output = self._list_timezone(country_code, zone_name)
+        if not status:
+            return False, output
+
+        # the zone list is cached; refresh the local 'timestamp' of each zone
+        now = int(time.time())
+        zones = [dict(zone, timestamp=now + zone.get("gmtOffset", 0)) for zone in output]
+
+        return True, zones
+
+
+    @cached("list_timezone", ttl=DAY, stale_ttl=DAY, negative_ttl=HOUR)
+    def _list_timezone(self, country_code=None, zone_name=None):
+
         url = f"{self.baseurl}/list-time-zone"
 
         params = {
@@ -51,7 +85,9 @@ class TZ_DB_REST_API_Client(REST_API_Client):
         message = output.get("message", "")
 
         if status and status == "FAILED":
-            return False, message
+            if "limit" in message.lower():
+                return False, message
+            return False, Negative_Result(message)
 
         zones = output.get("zones", [])
 
@@ -67,6 +103,34 @@ class TZ_DB_REST_API_Client(REST_API_Client):
                      lat=None,
                      lng=None):
 
+        # zone lookups are computed from the local IANA database; unknown zones fall back to TimeZoneDB
+        if lookup_by == "zone" and self.local is not None:
+            record = self.local.zone_record(zone_name)
+            if record is not None:
+                return True, [record]
+
+        # position lookups use the local boundary index when one is loaded
+        if lookup_by == "position" and self.geo is not None:
+            status, output = self.__locate(lat, lng)
+            if status:
+                return True, output
+            if isinstance(output, Negative_Result):
+                return False, output
+
+        return self._get_timezone(lookup_by, city_name, country_code, region_code, zone_name, lat, lng)
+
+
+    # the answer carries the current local time, so only failures are cached
+    @cached("get_timezone", ttl=0, negative_ttl=HOUR)
+    def _get_timezone(self,
+                      lookup_by="city",
+                      city_name=None,
+                      country_code=None,
+                      region_code=None,
+                      zone_name=None,
+                      lat=None,
+                      lng=None):
+
         if lookup_by == "city":
             if not city_name or not country_code:
                 return False, "city_name and country_code are both required in lookup by city."
@@ -104,8 +168,31 @@ class TZ_DB_REST_API_Client(REST_API_Client):
         message = output.get("message", "")
 
         if status and status == "FAILED":
-            return False, message
+            if "limit" in message.lower():
+                return False, message
+            return False, Negative_Result(message)
 
         zones = output.get("zones", [])
 
         return True, zones
+
+
+    def __locate(self, lat, lng):
+
+        try:
+            lat, lng = float(lat), float(lng)
+        except (TypeError, ValueError):
+            return False, Negative_Result(f"invalid position lat={lat}, lng={lng}")
+
+        if not (-90.0 <= lat <= 90.0 and -180.0 <= lng <= 180.0):
+            return False, Negative_Result(f"position out of range: lat={lat}, lng={lng}")
+
+        zone = self.geo.lookup(lat, lng)
+        if zone is None:
+            return False, f"no time zone boundary contains lat={lat}, lng={lng}"
+
+        record = self.local.zone_record(zone)
+        if record is None:
+            return False, f"zone {zone} of the boundary file is unknown to the local time zone database"
+
+        return True, [record]
@@ -0,0 +1,299 @@
+import os
+import sys
+import json
+import time
+import logging
+import numpy as np
+
+from apis.geocode_store import data_dir
+
+log = logging.getLogger(__name__)
+
+
+class TZ_Geo_Index():
+    """
+    Offline (lat, lng) -> IANA zone lookup over time zone boundary polygons
+    (e.g. the GeoJSON release of timezone-boundary-builder).
+
+    The world is split into a grid of cell_deg x cell_deg cells. For every
+    cell the index keeps:
+      - the polygon containing the cell center (or -1), and
+      - the polygon edges passing through the cell.
+    A point p is inside a polygon iff the cell center is, toggled once for
+    every edge of that polygon crossed by the segment center -> p. Only the
+    few edges of one cell are tested, so a lookup takes microseconds
+    whatever the size of the polygons.
+
+    Building the index is slow (seconds to minutes for the full boundary
+    file); it is done once and saved in a compact .npz form that loads fast.
+    """
+
+    def __init__(self, zones, poly_zone, cell_deg, center_poly, cell_offsets, cell_edges, edges, edge_poly):
+
+        self.zones = list(zones)
+        self.poly_zone = poly_zone
+        self.cell_deg = float(cell_deg)
+        self.nx = int(round(360 / self.cell_deg))
+        self.ny = int(round(180 / self.cell_deg))
+        self.center_poly = center_poly
+        self.cell_offsets = cell_offsets
+        self.cell_edges = cell_edges
+        self.edges = edges
+        self.edge_poly = edge_poly
+
+
+    #############################
+    ########## Build ############
+    #############################
+
+    @classmethod
+    def from_geojson(cls, path, cell_deg=0.5):
+        """Build the index from a GeoJSON FeatureCollection with a 'tzid' property per feature."""
+
+        with open(path, "r", encoding="utf-8") as f:
+            collection = json.load(f)
+
+        polygons = []
+        for feature in collection.get("features", []):
+            tzid = (feature.get("properties") or {}).get("tzid")
+            geometry = feature.get("geometry") or {}
+            if not tzid:
+                continue
+            if geometry.get("type") == "Polygon":
+                polygons.append((tzid, geometry["coordinates"]))
+            elif geometry.get("type") == "MultiPolygon":
+                polygons.extend((tzid, rings) for rings in geometry["coordinates"])
+
+        return cls.from_polygons(polygons, cell_deg=cell_deg)
+
+
+    @classmethod
+    def from_polygons(cls, polygons, cell_deg=0.5):
+        """
+        Build the index from [(zone_name, [ring, ...]), ...], where each ring is
+        a list of (lng, lat) vertices; the first ring is the outline and the
+        others are holes.
+        """
+
+        t0 = time.perf_counter()
+
+        zones = sorted({zone for zone, _ in polygons})
+        zone_ids = {zone: i for i, zone in enumerate(zones)}
+        poly_zone = np.array([zone_ids[zone] for zone, _ in polygons], dtype=np.int32)
+
+        # all ring edges as (x1, y1, x2, y2) rows, with the polygon of each edge
+        edge_blocks = []
+        poly_blocks = []
+        for p, (_, rings) in enumerate(polygons):
+            for ring in rings:
+                v = np.asarray(ring, dtype=np.float64)[:, :2]
+                if len(v) < 3:
+                    continue
+                if not np.array_equal(v[0], v[-1]):
+                    v = np.vstack([v, v[:1]])
+                edge_blocks.append(np.hstack([v[:-1], v[1:]]))
+                poly_blocks.append(np.full(len(v) - 1, p, dtype=np.int32))
+
+        edges = np.vstack(edge_blocks) if edge_blocks else np.zeros((0, 4))
+        edge_poly = np.concatenate(poly_blocks) if poly_blocks else np.zeros(0, dtype=np.int32)
+
+        nx = int(round(360 / cell_deg))
+        ny = int(round(180 / cell_deg))
+
+        # every edge is listed in each cell of its bounding box
+        col0, row0 = cls._cell_of(np.minimum(edges[:, 0], edges[:, 2]), np.minimum(edges[:, 1], edges[:, 3]), cell_deg, nx, ny)
+        col1, row1 = cls._cell_of(np.maximum(edges[:, 0], edges[:, 2]), np.maximum(edges[:, 1], edges[:, 3]), cell_deg, nx, ny)
+
+        width = col1 - col0 + 1
+        span = width * (row1 - row0 + 1)
+
+        edge_of_slot = np.repeat(np.arange(len(edges)), span)
+        k = np.arange(len(edge_of_slot)) - np.repeat(np.cumsum(span) - span, span)
+        cells = (row0[edge_of_slot] + k // width[edge_of_slot]) * nx + col0[edge_of_slot] + k % width[edge_of_slot]
+
+        order = np.argsort(cells, kind="stable")
+        cell_edges = edge_of_slot[order].astype(np.int32)
+        cell_offsets = np.zeros(nx * ny + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cells, minlength=nx * ny), out=cell_offsets[1:])
+
+        # polygon containing each cell center: scanline parity per polygon and grid row
+        center_poly = np.full(nx * ny, -1, dtype=np.int32)
+        center_x = -180.0 + (np.arange(nx) + 0.5) * cell_deg
+
+        poly_order = np.argsort(edge_poly, kind="stable")
+        poly_bounds = np.searchsorted(edge_poly[poly_order], np.arange(len(polygons) + 1))
+
+        for p in range(len(polygons)):
+
+            e = edges[poly_order[poly_bounds[p]:poly_bounds[p + 1]]]
+            if not len(e):
+                continue
+
+            xmin, xmax = min(e[:, 0].min(), e[:, 2].min()), max(e[:, 0].max(), e[:, 2].max())
+            ymin, ymax = min(e[:, 1].min(), e[:, 3].min()), max(e[:, 1].max(), e[:, 3].max())
+            c0, r0 = cls._cell_of(xmin, ymin, cell_deg, nx, ny)
+            c1, r1 = cls._cell_of(xmax, ymax, cell_deg, nx, ny)
+
+            for row in range(int(r0), int(r1) + 1):
+                yc = -90.0 + (row + 0.5) * cell_deg
+                crossing = (e[:, 1] <= yc) != (e[:, 3] <= yc)
+                if not crossing.any():
+                    continue
+                c = e[crossing]
+                xs = np.sort(c[:, 0] + (yc - c[:, 1]) * (c[:, 2] - c[:, 0]) / (c[:, 3] - c[:, 1]))
+                inside = np.searchsorted(xs, center_x[c0:c1 + 1]) % 2 == 1
+                center_poly[row * nx + c0 + np.flatnonzero(inside)] = p
+
+        log.info("TZ_Geo_Index: %d zones, %d polygons, %d edges indexed in %.1f s",
+                 len(zones), len(polygons), len(edges), time.perf_counter() - t0)
+
+        return cls(zones, poly_zone, cell_deg, center_poly, cell_offsets, cell_edges, edges, edge_poly)
+
+
+    @staticmethod
+    def _cell_of(x, y, cell_deg, nx, ny):
+
+        col = np.clip(np.floor((np.asarray(x) + 180.0) / cell_deg).astype(np.int64), 0, nx - 1)
+        row = np.clip(np.floor((np.asarray(y) + 90.0) / cell_deg).astype(np.int64), 0, ny - 1)
+        return col, row
+
+
+    #############################
+    ####### Save / Load #########
+    #############################
+
+    def save(self, path):
+
+        tmp_path = f"{path}.tmp.npz"
+
+        np.savez_compressed(tmp_path,
+                            zones=np.array(self.zones),
+                            poly_zone=self.poly_zone,
+                            cell_deg=np.array(self.cell_deg),
+                            center_poly=self.center_poly,
+                            cell_offsets=self.cell_offsets,
+                            cell_edges=self.cell_edges,
+                            edges=self.edges,
+                            edge_poly=self.edge_poly)
+
+        os.replace(tmp_path, path)
+
+
+    @classmethod
+    def load(cls, path):
+
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data["zones"].tolist(),
+                       data["poly_zone"],
+                       data["cell_deg"],
+                       data["center_poly"],
+                       data["cell_offsets"],
+                       data["cell_edges"],
+                       data["edges"],
+                       data["edge_poly"])
+
+
+    #############################
+    ########## Lookup ###########
+    #############################
+
+    def lookup(self, lat, lng):
+        """IANA zone containing (lat, lng), or None if no polygon contains it."""
+
+        col = min(max(int((lng + 180.0) // self.cell_deg), 0), self.nx - 1)
+        row = min(max(int((lat + 90.0) // self.cell_deg), 0), self.ny - 1)
+        cell = row * self.nx + col
+
+        center = int(self.center_poly[cell])
+        idx = self.cell_edges[self.cell_offsets[cell]:self.cell_offsets[cell + 1]]
+
+        if len(idx):
+
+            cx = -180.0 + (col + 0.5) * self.cell_deg
+            cy = -90.0 + (row + 0.5) * self.cell_deg
+
+            e = self.edges[idx]
+            ax, ay, bx, by = e[:, 0], e[:, 1], e[:, 2], e[:, 3]
+
+            # segment center -> point against every edge of the cell (half-open sign rule)
+            side_c = (bx - ax) * (cy - ay) - (by - ay) * (cx - ax) > 0
+            side_p = (bx - ax) * (lat - ay) - (by - ay) * (lng - ax) > 0
+            side_a = (lng - cx) * (ay - cy) - (lat - cy) * (ax - cx) > 0
+            side_b = (lng - cx) * (by - cy) - (lat - cy) * (bx - cx) > 0
+
+            crossed = self.edge_poly[idx[(side_c != side_p) & (side_a != side_b)]]
+
+            if len(crossed):
+                # polygons crossed an odd number of times flip between inside and outside
+                polys, counts = np.unique(crossed, return_counts=True)
+                inside = set(polys[counts % 2 == 1].tolist()) ^ ({center} if center >= 0 else set())
+                center = min(inside) if inside else -1
+
+        if center < 0:
+            return None
+
+        return self.zones[self.poly_zone[center]]
+
+
+    def stats(self):
+
+        return {
+            "zones": len(self.zones),
+            "polygons": len(self.poly_zone),
+            "edges": len(self.edges),
+            "cell_deg": self.cell_deg
+        }
+
+
+def load_geo_index(path=None):
+    """
+    Load the boundary index, or return None if no boundary data is available.
+
+    path (default: env TZ_BOUNDARY_FILE, else data/tz_boundaries.npz) is
+    either a prebuilt .npz or a GeoJSON file; a GeoJSON file is indexed once
+    and the prebuilt form is saved next to it.
+    """
+
+    path = path or os.getenv("TZ_BOUNDARY_FILE") or os.path.join(data_dir, "tz_boundaries.npz")
+
+    if not path.endswith(".npz"):
+        prebuilt = os.path.splitext(path)[0] + ".npz"
+        if os.path.exists(prebuilt) and (not os.path.exists(path) or os.path.getmtime(prebuilt) >= os.path.getmtime(path)):
+            path = prebuilt
+
+    if not os.path.exists(path):
+        log.info("TZ_Geo_Index: no boundary file at %s, position lookups use TimeZoneDB", path)
+        return None
+
+    t0 = time.perf_counter()
+
+    try:
+        if path.endswith(".npz"):
+            index = TZ_Geo_Index.load(path)
+        else:
+            index = TZ_Geo_Index.from_geojson(path)
+            index.save(os.path.splitext(path)[0] + ".npz")
+    except Exception as E:
+        log.error("TZ_Geo_Index: cannot load %s: %s", path, E)
+        return None
+
+    log.info("TZ_Geo_Index: loaded %s in %.0f ms (%s)", path, (time.perf_counter() - t0) * 1000, index.stats())
+
+    return index
+
+
+if __name__ == "__main__":
+
+    # prebuild the index:  python3 -m apis.tz_geo <boundaries.geojson> [out.npz] [cell_deg]
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if len(sys.argv) < 2:
+        print("usage: python3 -m apis.tz_geo <boundaries.geojson> [out.npz] [cell_deg]")
+        sys.exit(1)
+
+    source = sys.argv[1]
+    target = sys.argv[2] if len(sys.argv) > 2 else os.path.join(data_dir, "tz_boundaries.npz")
+    cell = float(sys.argv[3]) if len(sys.argv) > 3 else 0.5
+
+    TZ_Geo_Index.from_geojson(source, cell_deg=cell).save(target)
+    print(f"saved {target}")
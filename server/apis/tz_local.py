@@ -0,0 +1,497 @@
+import os
+import time
+import bisect
+import difflib
+import logging
+import threading
+import zoneinfo
+import numpy as np
+from datetime import datetime, timezone
+
+log = logging.getLogger(__name__)
+
+DAY = 24 * 3600
+YEAR = 365 * DAY
+
+# abbreviations (unambiguous ones only) and large cities without a zone of their own,
+# accepted in place of a zone name
+ZONE_ALIASES = {
+    "utc": "UTC",
+    "gmt": "UTC",
+    "pt": "America/Los_Angeles",
+    "pst": "America/Los_Angeles",
+    "pdt": "America/Los_Angeles",
+    "mt": "America/Denver",
+    "mst": "America/Denver",
+    "mdt": "America/Denver",
+    "ct": "America/Chicago",
+    "cdt": "America/Chicago",
+    "et": "America/New_York",
+    "est": "America/New_York",
+    "edt": "America/New_York",
+    "cet": "Europe/Berlin",
+    "cest": "Europe/Berlin",
+    "jst": "Asia/Tokyo",
+    "san francisco": "America/Los_Angeles",
+    "seattle": "America/Los_Angeles",
+    "dallas": "America/Chicago",
+    "houston": "America/Chicago",
+    "austin": "America/Chicago",
+    "boston": "America/New_York",
+    "washington": "America/New_York",
+    "miami": "America/New_York",
+    "atlanta": "America/New_York",
+    "munich": "Europe/Berlin",
+    "frankfurt": "Europe/Berlin",
+    "mumbai": "Asia/Kolkata",
+    "delhi": "Asia/Kolkata",
+    "new delhi": "Asia/Kolkata",
+    "bangalore": "Asia/Kolkata",
+    "bengaluru": "Asia/Kolkata",
+    "beijing": "Asia/Shanghai",
+    "osaka": "Asia/Tokyo"
+}
+
+
+def read_tzdata_file(name):
+    """
+    Return the text of a tzdata table (zone.tab, zone1970.tab, iso3166.tab),
+    searched in the system TZPATH first, then in the 'tzdata' package.
+    Returns None if it cannot be found.
+    """
+
+    for directory in zoneinfo.TZPATH:
+        path = os.path.join(directory, name)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                return f.read()
+
+    try:
+        from importlib import resources
+        return resources.files("tzdata").joinpath("zoneinfo", name).read_text(encoding="utf-8")
+    except Exception:
+        return None
+
+
+def load_country_names():
+    """{'US': 'United States', ...} from iso3166.tab"""
+
+    names = {}
+
+    for line in (read_tzdata_file("iso3166.tab") or "").splitlines():
+        if not line or line.startswith("#"):
+            continue
+        code, name = line.split("\t", 1)
+        names[code] = name.strip()
+
+    return names
+
+
+def load_zone_countries():
+    """
+    {'America/Los_Angeles': 'US', ...} from zone.tab (one country per zone),
+    plus {'America/Los_Angeles': (lat, lng)} of the principal city of each zone.
+    """
+
+    countries = {}
+    positions = {}
+
+    for line in (read_tzdata_file("zone.tab") or "").splitlines():
+        if not line or line.startswith("#"):
+            continue
+        fields = line.split("\t")
+        if len(fields) < 3:
+            continue
+        countries[fields[2]] = fields[0]
+        positions[fields[2]] = _parse_iso6709(fields[1])
+
+    return countries, positions
+
+
+def _parse_iso6709(value):
+    """'+3404-11815' / '+340308-1181434' -> (34.07, -118.25)"""
+
+    split = max(value.rfind("+"), value.rfind("-"))
+    lat, lng = value[:split], value[split:]
+
+    def to_degrees(text, degree_digits):
+        sign = -1 if text[0] == "-" else 1
+        digits = text[1:]
+        degrees = int(digits[:degree_digits])
+        minutes = int(digits[degree_digits:degree_digits + 2])
+        seconds = int(digits[degree_digits + 2:] or 0)
+        return sign * (degrees + minutes / 60 + seconds / 3600)
+
+    return round(to_degrees(lat, 2), 4), round(to_degrees(lng, 3), 4)
+
+
+class Zone_Transitions():
+    """
+    Precomputed transition table of one IANA zone.
+
+    times[i] is the UTC time from which offsets[i] / dsts[i] / abbreviations[i]
+    apply, up to times[i + 1]. The table covers 1970 to 'until'; lookups are a
+    bisection, so resolving a zone at any time in the range takes microseconds.
+    """
+
+    def __init__(self, zone_name, until):
+
+        self.zone_name = zone_name
+
+        tz = zoneinfo.ZoneInfo(zone_name)
+
+        def state(ts):
+            local = datetime.fromtimestamp(ts, tz)
+            return (int(local.utcoffset().total_seconds()), bool(local.dst()), local.tzname())
+
+        self.times = [0]
+        self.offsets = []
+        self.dsts = []
+        self.abbreviations = []
+
+        current = state(0)
+        self.__append(None, current)
+
+        # walk one day at a time, then bisect each change down to the second
+        ts = 0
+        while ts < until:
+            nxt = state(ts + DAY)
+            if nxt != current:
+                lo, hi = ts, ts + DAY
+                while hi - lo > 1:
+                    mid = (lo + hi) // 2
+                    if state(mid) == current:
+                        lo = mid
+                    else:
+                        hi = mid
+                current = state(hi)
+                self.__append(hi, current)
+            ts += DAY
+
+        # array copies for vectorized lookups of many instants
+        self.times_array = np.array(self.times, dtype=np.int64)
+        self.offsets_array = np.array(self.offsets, dtype=np.int64)
+        self.abbreviations_array = np.array(self.abbreviations)
+
+
+    def __append(self, ts, state):
+
+        if ts is not None:
+            self.times.append(ts)
+
+        offset, dst, abbreviation = state
+        self.offsets.append(offset)
+        self.dsts.append(dst)
+        self.abbreviations.append(abbreviation)
+
+
+    def index(self, ts):
+        """Index of the period containing unix time ts."""
+
+        return max(bisect.bisect_right(self.times, ts) - 1, 0)
+
+
+    def offsets_at(self, ts):
+        """UTC offsets (seconds) and abbreviations at every unix time of the array ts."""
+
+        i = np.maximum(np.searchsorted(self.times_array, ts, side="right") - 1, 0)
+        return self.offsets_array[i], self.abbreviations_array[i]
+
+
+    def at(self, ts):
+        """
+        Return (gmtOffset, dst, abbreviation, zoneStart, zoneEnd, nextAbbreviation)
+        at unix time ts. zoneStart / zoneEnd / nextAbbreviation are None when
+        unknown (no transition before ts / after ts in the table).
+        """
+
+        i = self.index(ts)
+
+        zone_start = self.times[i] if i > 0 else None
+
+        if i + 1 < len(self.times):
+            zone_end = self.times[i + 1]
+            next_abbreviation = self.abbreviations[i + 1]
+        else:
+            zone_end = None
+            next_abbreviation = None
+
+        return self.offsets[i], self.dsts[i], self.abbreviations[i], zone_start, zone_end, next_abbreviation
+
+
+class Local_TZ_Resolver():
+    """
+    Offline replacement of TimeZoneDB lookups, built from the IANA database
+    shipped with Python (zoneinfo, with the 'tzdata' package as fallback).
+
+    Transition tables are built on the first lookup of a zone (a few tens of
+    milliseconds) and kept in memory; later lookups of the zone are a
+    bisection.
+
+    The zone list (zone.tab) is indexed at construction by country code,
+    country name, zone name and city name, so listing zones is a dictionary
+    lookup (or a bisection for prefixes). Offsets are computed for 'now' on
+    each listing.
+    """
+
+    def __init__(self, years_ahead=30):
+        """
+        :param years_ahead: transition tables cover 1970 to now + years_ahead
+        """
+
+        self.until = int(time.time()) + years_ahead * YEAR
+
+        self.zone_names = {name.lower(): name for name in zoneinfo.available_timezones()}
+
+        self.country_names = load_country_names()
+        self.zone_countries, self.zone_positions = load_zone_countries()
+
+        self.lock = threading.Lock()
+        self.tables = {}
+
+        self.__build_index()
+
+
+    def __build_index(self):
+
+        # country code -> zones, in zone.tab order
+        self.country_zones = {}
+        for zone, code in self.zone_countries.items():
+            self.country_zones.setdefault(code, []).append(zone)
+
+        # lower-case country name -> code
+        self.country_codes = {name.lower(): code for code, name in self.country_names.items()}
+
+        # sorted lower-case zone names, for prefix search by bisection
+        self.listed_zones = sorted(self.zone_countries, key=str.lower)
+        self.listed_keys = [zone.lower() for zone in self.listed_zones]
+
+        # 'los angeles' -> ['America/Los_Angeles'], 'kolkata' -> ['Asia/Kolkata']
+        self.city_zones = {}
+        for zone in self.listed_zones:
+            city = zone.rsplit("/", 1)[-1].replace("_", " ").lower()
+            self.city_zones.setdefault(city, []).append(zone)
+
+
+    def canonical_zone(self, zone_name):
+        """Properly cased IANA name of zone_name, or None if unknown."""
+
+        if not zone_name:
+            return None
+
+        return self.zone_names.get(str(zone_name).strip().lower())
+
+
+    def transitions(self, zone_name):
+        """Zone_Transitions of a (canonical) zone name, built on first use."""
+
+        table = self.tables.get(zone_name)
+        if table is not None:
+            return table
+
+        with self.lock:
+            table = self.tables.get(zone_name)
+            if table is None:
+                t0 = time.perf_counter()
+                table = Zone_Transitions(zone_name, self.until)
+                self.tables[zone_name] = table
+                log.debug("Local_TZ_Resolver: built %s (%d transitions) in %.1f ms",
+                          zone_name, len(table.times), (time.perf_counter() - t0) * 1000)
+
+        return table
+
+
+    def zone_record(self, zone_name, ts=None):
+        """
+        TimeZoneDB-style get-time-zone record of a zone at unix time ts (default: now),
+        or None if the zone is unknown.
+        """
+
+        zone = self.canonical_zone(zone_name)
+        if zone is None:
+            return None
+
+        ts = int(time.time()) if ts is None else int(ts)
+
+        offset, dst, abbreviation, zone_start, zone_end, next_abbreviation = self.transitions(zone).at(ts)
+
+        country_code = self.zone_countries.get(zone, "")
+        local = ts + offset
+
+        return {
+            "countryCode": country_code,
+            "countryName": self.country_names.get(country_code, ""),
+            "regionName": "",
+            "cityName": "",
+            "zoneName": zone,
+            "abbreviation": abbreviation,
+            "gmtOffset": offset,
+            "dst": "1" if dst else "0",
+            "zoneStart": zone_start,
+            "zoneEnd": zone_end,
+            "nextAbbreviation": next_abbreviation,
+            "timestamp": local,
+            "formatted": datetime.fromtimestamp(local, timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        }
+
+
+    def find_country(self, country):
+        """ISO code of a country given by code or (approximate) name, or None."""
+
+        if not country:
+            return None
+
+        text = str(country).strip()
+
+        if text.upper() in self.country_zones:
+            return text.upper()
+
+        code = self.country_codes.get(text.lower())
+        if code:
+            return code
+
+        match = difflib.get_close_matches(text.lower(), self.country_codes.keys(), n=1, cutoff=0.75)
+        return self.country_codes[match[0]] if match else None
+
+
+    def resolve_zone(self, name):
+        """
+        Best single zone for a zone name, alias ('PT', 'CET') or city name
+        ('Berlin', 'Mumbai'), or None.
+        """
+
+        if not name:
+            return None
+
+        zone = ZONE_ALIASES.get(str(name).strip().lower()) or self.canonical_zone(name)
+        if zone:
+            return zone
+
+        zones = self.find_zones(name)
+        return zones[0] if zones else None
+
+
+    def find_zones(self, zone_name):
+        """
+        Zones matching zone_name, by (in order): exact name, prefix of the zone
+        name ('America/' or 'America/*'), prefix of the city name ('los ang'),
+        then fuzzy match of the zone or city name ('Kolkatta').
+        """
+
+        text = str(zone_name).strip().rstrip("*").lower()
+        if not text:
+            return []
+
+        zone = self.zone_names.get(text)
+        if zone is not None:
+            return [zone]
+
+        i = bisect.bisect_left(self.listed_keys, text)
+        j = bisect.bisect_left(self.listed_keys, text + "\uffff")
+        if j > i:
+            return self.listed_zones[i:j]
+
+        city = text.replace("_", " ")
+        zones = [z for key, group in self.city_zones.items() if key.startswith(city) for z in group]
+        if zones:
+            return sorted(zones)
+
+        matches = difflib.get_close_matches(text, self.listed_keys, n=5, cutoff=0.8)
+        zones = [self.listed_zones[self.listed_keys.index(m)] for m in matches]
+
+        for m in difflib.get_close_matches(city, self.city_zones.keys(), n=5, cutoff=0.75):
+            zones.extend(z for z in self.city_zones[m] if z not in zones)
+
+        return zones
+
+
+    def list_zones(self, country_code=None, zone_name=None):
+        """
+        TimeZoneDB-style list-time-zone records (countryCode, countryName,
+        zoneName, gmtOffset, timestamp) for 'now', filtered by country and/or
+        zone name. Without filters, every zone of zone.tab is listed.
+        """
+
+        if country_code:
+            code = self.find_country(country_code)
+            zones = self.country_zones.get(code, [])
+        else:
+            zones = self.listed_zones
+
+        if zone_name:
+            matched = self.find_zones(zone_name)
+            if country_code:
+                allowed = set(zones)
+                zones = [z for z in matched if z in allowed]
+            else:
+                zones = matched
+
+        now = datetime.now(timezone.utc)
+        records = []
+
+        for zone in zones:
+            offset = int(now.astimezone(zoneinfo.ZoneInfo(zone)).utcoffset().total_seconds())
+            code = self.zone_countries.get(zone, "")
+            records.append({
+                "countryCode": code,
+                "countryName": self.country_names.get(code, ""),
+                "zoneName": zone,
+                "gmtOffset": offset,
+                "timestamp": int(now.timestamp()) + offset
+            })
+
+        return records
+
+
+    def local_grid(self, zones, ts):
+        """
+        Local times of many zones at many instants, DST-aware.
+
+        :param zones: canonical zone names (Z)
+        :param ts: unix times (T)
+        :return: (local unix times Z x T, abbreviations Z x T)
+        """
+
+        ts = np.asarray(ts, dtype=np.int64)
+
+        offsets = np.empty((len(zones), len(ts)), dtype=np.int64)
+        abbreviations = np.empty((len(zones), len(ts)), dtype=object)
+
+        for z, zone in enumerate(zones):
+            offsets[z], abbreviations[z] = self.transitions(zone).offsets_at(ts)
+
+        return ts[np.newaxis, :] + offsets, abbreviations
+
+
+    def business_hours(self, zones, ts, work_start, work_end):
+        """
+        Which zones are in business hours at each instant.
+
+        :param work_start: start of the working day, minutes after local midnight
+        :param work_end: end of the working day, minutes after local midnight
+        :return: boolean array Z x T (Monday to Friday, work_start <= local time < work_end)
+        """
+
+        local, _ = self.local_grid(zones, ts)
+
+        minute_of_day = (local % DAY) // 60
+        weekday = (local // DAY + 3) % 7          # 1970-01-01 was a Thursday; Monday = 0
+
+        return (weekday < 5) & (minute_of_day >= work_start) & (minute_of_day < work_end)
+
+
+_resolver = None
+_resolver_lock = threading.Lock()
+
+
+def get_local_resolver():
+    """Process-wide Local_TZ_Resolver, created on first use."""
+
+    global _resolver
+
+    if _resolver is None:
+        with _resolver_lock:
+            if _resolver is None:
+                _resolver = Local_TZ_Resolver()
+
+    return _resolver
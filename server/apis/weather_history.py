@@ -0,0 +1,172 @@
+import os
+import time
+import sqlite3
+import logging
+import threading
+
+from apis.geocode_store import Geocode_Store, data_dir
+
+log = logging.getLogger(__name__)
+
+DAY = 24 * 3600
+
+# observation columns, all in CANONICAL_UNIT (Celsius, m/s)
+COLUMNS = ("temp", "feels_like", "humidity", "pressure", "wind_speed", "wind_deg", "wind_gust", "clouds", "conditions")
+
+
+class Weather_History():
+    """
+    Local time series of weather observations, kept in SQLite on local disk.
+
+    Every observation fetched from OpenWeather (current weather or the
+    'current' part of a One Call snapshot) is appended, one row per
+    (location, observation time). The primary key is (location, ts) in a
+    WITHOUT ROWID table, so rows of a location are stored in time order and
+    range queries read one contiguous slice. Rows older than the retention
+    are pruned, at most once an hour.
+    """
+
+    def __init__(self, path=None, retention_days=30):
+        """
+        :param path: SQLite file (default: data/weather_history.sqlite)
+        :param retention_days: observations older than this are removed
+        """
+
+        self.path = path or os.path.join(data_dir, "weather_history.sqlite")
+        self.retention = retention_days * DAY
+
+        self.lock = threading.Lock()
+
+        # last observation time per location, to skip re-recording a cached snapshot
+        self.last_ts = {}
+        self.last_prune = 0.0
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        self.conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS observation (
+                location    TEXT    NOT NULL,
+                ts          INTEGER NOT NULL,
+                tz_shift    INTEGER NOT NULL DEFAULT 0,
+                temp        REAL,
+                feels_like  REAL,
+                humidity    INTEGER,
+                pressure    INTEGER,
+                wind_speed  REAL,
+                wind_deg    INTEGER,
+                wind_gust   REAL,
+                clouds      INTEGER,
+                conditions  TEXT,
+                PRIMARY KEY (location, ts)
+            ) WITHOUT ROWID""")
+
+
+    @staticmethod
+    def location_key(city_name=None, city_id=None, zip_code=None):
+
+        if city_name:
+            return Geocode_Store.normalize_city(city_name)
+        if city_id:
+            return f"id:{city_id}"
+        return f"zip:{zip_code}"
+
+
+    def record_current_weather(self, location, data):
+        """Append an observation from a current weather (API 2.5) response."""
+
+        main = data.get("main", {})
+        wind = data.get("wind", {})
+
+        self.__record(location, data.get("dt"), data.get("timezone", 0), {
+            "temp": main.get("temp"),
+            "feels_like": main.get("feels_like"),
+            "humidity": main.get("humidity"),
+            "pressure": main.get("pressure"),
+            "wind_speed": wind.get("speed"),
+            "wind_deg": wind.get("deg"),
+            "wind_gust": wind.get("gust"),
+            "clouds": data.get("clouds", {}).get("all"),
+            "conditions": (data.get("weather") or [{}])[0].get("description")
+        })
+
+
+    def record_onecall(self, location, snapshot):
+        """Append the 'current' observation of a One Call snapshot."""
+
+        current = snapshot.get("current") or {}
+
+        self.__record(location, current.get("dt"), snapshot.get("timezone_offset", 0), {
+            "temp": current.get("temp"),
+            "feels_like": current.get("feels_like"),
+            "humidity": current.get("humidity"),
+            "pressure": current.get("pressure"),
+            "wind_speed": current.get("wind_speed"),
+            "wind_deg": current.get("wind_deg"),
+            "wind_gust": current.get("wind_gust"),
+            "clouds": current.get("clouds"),
+            "conditions": (current.get("weather") or [{}])[0].get("description")
+        })
+
+
+    def query(self, location, start_ts, end_ts):
+        """
+        Observations of location with start_ts <= ts <= end_ts, in time order,
+        as a list of dicts (ts, tz_shift and COLUMNS).
+        """
+
+        with self.lock:
+            cursor = self.conn.execute(
+                f"SELECT ts, tz_shift, {', '.join(COLUMNS)} FROM observation "
+                "WHERE location = ? AND ts BETWEEN ? AND ? ORDER BY ts",
+                (location, int(start_ts), int(end_ts)))
+            names = [x[0] for x in cursor.description]
+            return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+
+    def latest_tz_shift(self, location):
+        """UTC offset (seconds) of the latest observation of location, or None if unknown."""
+
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT tz_shift FROM observation WHERE location = ? ORDER BY ts DESC LIMIT 1",
+                (location,)).fetchone()
+
+        return row[0] if row else None
+
+
+    def prune(self):
+        """Remove observations older than the retention; returns the number of rows removed."""
+
+        with self.lock:
+            cursor = self.conn.execute("DELETE FROM observation WHERE ts < ?",
+                                       (int(time.time() - self.retention),))
+            self.last_prune = time.time()
+            return cursor.rowcount
+
+
+    def __record(self, location, ts, tz_shift, values):
+
+        if not ts:
+            return
+
+        if self.last_ts.get(location) == ts:
+            return
+
+        try:
+            with self.lock:
+                self.conn.execute(
+                    f"INSERT OR REPLACE INTO observation (location, ts, tz_shift, {', '.join(COLUMNS)}) "
+                    f"VALUES (?, ?, ?, {', '.join('?' * len(COLUMNS))})",
+                    (location, int(ts), int(tz_shift or 0), *(values[c] for c in COLUMNS)))
+                self.last_ts[location] = ts
+        except Exception as E:
+            log.error("Weather_History: cannot record observation of '%s': %s", location, E)
+            return
+
+        if time.time() - self.last_prune > 3600:
+            removed = self.prune()
+            if removed:
+                log.info("Weather_History: pruned %d observations", removed)
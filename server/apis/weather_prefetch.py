@@ -0,0 +1,163 @@
+import os
+import time
+import logging
+import threading
+
+from influxdb_exporter import get_exporter
+
+log = logging.getLogger(__name__)
+
+
+class Weather_Prefetcher():
+    """
+    Keeps the weather of a watch list of cities warm in the client cache.
+
+    A background thread refreshes the current weather and the One Call
+    snapshot of every watched city shortly before their cache entries go
+    stale, so tool calls for these cities are answered from memory.
+
+    Upstream calls are paced by a budget (calls per hour): the calls of a
+    cycle are spread evenly, and when the watch list needs more calls than
+    the budget allows, the cycle is stretched instead of exceeding it.
+    """
+
+    # refresh when this fraction of the fresh TTL has passed
+    REFRESH_AT = 0.9
+
+    def __init__(self,
+                 client,
+                 locations,
+                 budget_per_hour=120,
+                 interval=None,
+                 include_onecall=True):
+        """
+        :param client: Open_Weather_REST_API_Client whose cache is kept warm
+        :param locations: city names to watch
+        :param budget_per_hour: max upstream calls per hour spent on prefetching
+        :param interval: seconds between two refreshes of a city (default: from the cache TTLs)
+        :param include_onecall: also refresh One Call snapshots (paid plan)
+        """
+
+        self.client = client
+        self.locations = list(dict.fromkeys(x.strip() for x in locations if x.strip()))
+        self.budget_per_hour = budget_per_hour
+        self.include_onecall = include_onecall
+
+        if interval is None:
+            ttl = client.cache.ttl_for("get_current_weather", 600)
+            if include_onecall:
+                ttl = min(ttl, client.cache.ttl_for("onecall_snapshot", 600))
+            interval = ttl * self.REFRESH_AT
+
+        self.jobs = []
+        for location in self.locations:
+            self.jobs.append(("current", location, client.refresh_current_weather))
+            if include_onecall:
+                self.jobs.append(("onecall", location, client.refresh_onecall_snapshot))
+
+        # spacing between two upstream calls, and the resulting cycle length
+        self.spacing = 3600.0 / budget_per_hour
+        self.interval = max(interval, len(self.jobs) * self.spacing)
+
+        if self.jobs and self.interval > interval:
+            log.warning("Weather_Prefetcher: %d refreshes per cycle exceed the budget of %d calls/hour, "
+                        "refreshing every %.0f s instead of %.0f s",
+                        len(self.jobs), budget_per_hour, self.interval, interval)
+
+        self.stop_event = threading.Event()
+        self.thread = None
+
+        self.counters = {"refreshed": 0, "failed": 0, "cycles": 0}
+        self.last_error = {}
+
+
+    @classmethod
+    def from_env(cls, client):
+        """
+        Build a prefetcher from environment variables, or return None when no
+        city is watched:
+            WEATHER_WATCH_LIST: cities separated by ';' (e.g. "Tokyo;Walnut Creek, US")
+            WEATHER_PREFETCH_BUDGET: upstream calls per hour (default 120)
+            WEATHER_PREFETCH_ONECALL: "0" to skip One Call snapshots (free plan)
+        """
+
+        watch_list = os.getenv("WEATHER_WATCH_LIST", "")
+        locations = [x for x in watch_list.split(";") if x.strip()]
+        if not locations:
+            return None
+
+        return cls(client,
+                   locations,
+                   budget_per_hour=int(os.getenv("WEATHER_PREFETCH_BUDGET", "120")),
+                   include_onecall=os.getenv("WEATHER_PREFETCH_ONECALL", "1") != "0")
+
+
+    def start(self):
+
+        if self.thread is not None or not self.jobs:
+            return
+
+        log.info("Weather_Prefetcher: watching %d cities (%d refreshes every %.0f s)",
+                 len(self.locations), len(self.jobs), self.interval)
+
+        self.thread = threading.Thread(target=self.__run, name="weather-prefetch", daemon=True)
+        self.thread.start()
+
+
+    def stop(self):
+
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=5)
+            self.thread = None
+
+
+    def stats(self):
+
+        return dict(self.counters,
+                    watched=len(self.locations),
+                    interval_s=self.interval,
+                    budget_per_hour=self.budget_per_hour)
+
+
+    def __run(self):
+
+        while not self.stop_event.is_set():
+
+            cycle_start = time.monotonic()
+
+            for kind, location, refresh in self.jobs:
+
+                if self.stop_event.is_set():
+                    return
+
+                call_start = time.monotonic()
+                self.__refresh(kind, location, refresh)
+
+                # pace the calls to stay within the budget
+                self.stop_event.wait(max(self.spacing - (time.monotonic() - call_start), 0))
+
+            self.counters["cycles"] += 1
+            get_exporter().set_gauge("mcp_weather_prefetch", {}, self.stats())
+
+            self.stop_event.wait(max(self.interval - (time.monotonic() - cycle_start), 0))
+
+
+    def __refresh(self, kind, location, refresh):
+
+        try:
+            status, output = refresh(location)
+        except Exception as E:
+            status, output = False, str(E)
+
+        if status:
+            self.counters["refreshed"] += 1
+            self.last_error.pop((kind, location), None)
+            return
+
+        self.counters["failed"] += 1
+
+        # log a failing city once, not on every cycle
+        if self.last_error.get((kind, location)) != str(output):
+            log.warning("Weather_Prefetcher: refreshing %s of '%s' failed: %s", kind, location, output)
+            self.last_error[(kind, location)] = str(output)
@@ -0,0 +1,78 @@
+import numpy as np
+
+# Unit system every OpenWeather response is fetched (and cached) in.
+# Other unit systems are converted locally, so one cache entry serves all of them.
+CANONICAL_UNIT = "metric"
+
+UNITS = ("imperial", "metric", "standard")
+
+# keys holding a temperature, either a number or a dict of numbers
+# (e.g. daily 'temp': {'day', 'min', 'max', 'night', 'eve', 'morn'})
+TEMPERATURE_KEYS = {"temp", "feels_like", "temp_min", "temp_max", "dew_point"}
+
+# keys holding a wind speed
+SPEED_KEYS = {"speed", "gust", "wind_speed", "wind_gust"}
+
+MPS_TO_MPH = 2.2369362920544
+
+
+def convert_units(data, unit):
+    """
+    Convert an OpenWeather response fetched in CANONICAL_UNIT (Celsius, m/s)
+    to unit ("imperial", "metric" or "standard").
+
+    Returns a converted copy; the input (usually a shared cache entry) is not
+    modified. All temperatures and all wind speeds of the document are
+    gathered and converted in one vectorized operation each.
+    """
+
+    if unit == CANONICAL_UNIT:
+        return data
+
+    temperatures = []
+    speeds = []
+
+    converted = _copy_and_collect(data, temperatures, speeds)
+
+    if temperatures:
+        values = np.fromiter((c[k] for c, k in temperatures), dtype=np.float64, count=len(temperatures))
+        values = values * 1.8 + 32.0 if unit == "imperial" else values + 273.15
+        for (container, key), value in zip(temperatures, np.round(values, 2).tolist()):
+            container[key] = value
+
+    if speeds and unit == "imperial":
+        values = np.fromiter((c[k] for c, k in speeds), dtype=np.float64, count=len(speeds))
+        values = values * MPS_TO_MPH
+        for (container, key), value in zip(speeds, np.round(values, 2).tolist()):
+            container[key] = value
+
+    return converted
+
+
+def _copy_and_collect(node, temperatures, speeds, in_temperature=False):
+    """Deep-copy node, recording (container, key) of every temperature and speed number."""
+
+    if isinstance(node, list):
+        return [_copy_and_collect(item, temperatures, speeds, in_temperature) for item in node]
+
+    if not isinstance(node, dict):
+        return node
+
+    copy = {}
+
+    for key, value in node.items():
+
+        is_number = isinstance(value, (int, float)) and not isinstance(value, bool)
+
+        if is_number and (in_temperature or key in TEMPERATURE_KEYS):
+            copy[key] = value
+            temperatures.append((copy, key))
+        elif is_number and not in_temperature and key in SPEED_KEYS:
+            copy[key] = value
+            speeds.append((copy, key))
+        elif isinstance(value, dict) and key in TEMPERATURE_KEYS:
+            copy[key] = _copy_and_collect(value, temperatures, speeds, in_temperature=True)
+        else:
+            copy[key] = _copy_and_collect(value, temperatures, speeds, in_temperature)
+
+    return copy
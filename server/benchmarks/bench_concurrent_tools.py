@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+
+# Benchmark: N concurrent tool calls vs. a single call.
+#
+# Tools produced by generate_tools_from_client are async and run blocking
+# client methods on the bounded tool executor, so N concurrent calls of a
+# network-bound tool should finish in roughly the time of one call.
+#
+# Usage (from the server directory):
+#   python3 benchmarks/bench_concurrent_tools.py --calls 16
+#   python3 benchmarks/bench_concurrent_tools.py --calls 16 --live   # real Finnhub quotes
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.decorator import include_as_tool
+from tools.executor import configure_tool_executor, get_tool_executor
+from tools.generate_tools import generate_tools_from_client
+
+
+class Simulated_Stock():
+    """Stand-in for LLM_Stock whose company_quote blocks like an HTTP call."""
+
+    def __init__(self, latency):
+
+        self.latency = latency
+
+
+    @include_as_tool
+    def company_quote(self, symbol):
+        """
+        Get the current stock price (simulated upstream latency).
+
+        Parameters:
+        - symbol (str): Stock ticker symbol (e.g., 'AMZN').
+        """
+
+        time.sleep(self.latency)
+        return True, f"{symbol} stock quote: $100.00"
+
+
+async def run(tool, symbols):
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*[tool.ainvoke({"symbol": s}) for s in symbols])
+    return time.perf_counter() - t0
+
+
+def main():
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=16, help="number of concurrent calls")
+    parser.add_argument("--latency", type=float, default=0.25, help="simulated upstream latency (s)")
+    parser.add_argument("--workers", type=int, default=16, help="tool executor size")
+    parser.add_argument("--live", action="store_true", help="call Finnhub through LLM_Stock")
+    args = parser.parse_args()
+
+    configure_tool_executor(args.workers)
+
+    if args.live:
+        from tools.tools_stock import LLM_Stock
+        provider = LLM_Stock()
+        symbols = ["AAPL", "MSFT", "NVDA", "AMZN", "GOOG", "META", "TSLA", "CSCO"]
+    else:
+        provider = Simulated_Stock(args.latency)
+        symbols = ["SYM"]
+
+    tools = generate_tools_from_client([provider])
+    tool = next(t for t in tools if t.name == "company_quote")
+
+    batch = [symbols[i % len(symbols)] for i in range(args.calls)]
+
+    single = asyncio.run(run(tool, batch[:1]))
+    concurrent = asyncio.run(run(tool, batch))
+
+    print(f"{'1 call':<22}: {single * 1000:8.1f} ms")
+    print(f"{f'{args.calls} concurrent calls':<22}: {concurrent * 1000:8.1f} ms  ({concurrent / single:.2f}x a single call)")
+    print(f"{'executor':<22}: {get_tool_executor().stats()}")
+
+
+if __name__ == "__main__":
+
+    main()
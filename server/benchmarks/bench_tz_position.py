@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+
+# Benchmark: offline (lat, lng) -> time zone lookups over random coordinates.
+#
+# Uses the prebuilt boundary index (data/tz_boundaries.npz, or --index).
+# Without boundary data, a synthetic world is generated instead: 24 bands
+# with wavy borders (many vertices each) and round islands cut out of them
+# as holes, which exercises the same code paths. A sample of the lookups
+# is checked against a brute-force point-in-polygon test.
+#
+# Usage (from the server directory):
+#   python3 benchmarks/bench_tz_position.py --points 100000
+#   python3 benchmarks/bench_tz_position.py --index data/timezones.geojson
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apis.tz_geo import TZ_Geo_Index, load_geo_index
+
+
+def synthetic_polygons(vertices_per_border=2000, islands=40, seed=7):
+
+    rng = np.random.default_rng(seed)
+
+    lat = np.linspace(-89.9, 89.9, vertices_per_border)
+    borders = [-180.0] + [-180.0 + 15 * k + 3.0 * np.sin(lat / 7.0 + k) for k in range(1, 24)] + [180.0]
+
+    def border(k):
+        return np.full_like(lat, borders[k]) if np.isscalar(borders[k]) else borders[k]
+
+    island_rings = {}
+    for i in range(islands):
+        k = int(rng.integers(0, 24))
+        cx = -180.0 + 15 * k + 7.5
+        cy = float(rng.uniform(-70, 70))
+        t = np.linspace(0, 2 * np.pi, 200, endpoint=False)
+        ring = np.column_stack([cx + 2.0 * np.cos(t), cy + 1.5 * np.sin(t)])
+        island_rings.setdefault(k, []).append(ring)
+
+    polygons = []
+    for k in range(24):
+        outline = np.vstack([np.column_stack([border(k), lat]),
+                             np.column_stack([border(k + 1)[::-1], lat[::-1]])])
+        holes = island_rings.get(k, [])
+        polygons.append((f"Band/{k:02d}", [outline.tolist()] + [h.tolist() for h in holes]))
+        polygons.extend((f"Island/{k:02d}_{i}", [h.tolist()]) for i, h in enumerate(holes))
+
+    return polygons
+
+
+def brute_force(polygons, lat, lng):
+    """Zone of (lat, lng) by ray casting over every ring of every polygon."""
+
+    for zone, rings in polygons:
+        inside = False
+        for ring in rings:
+            v = np.asarray(ring)
+            a, b = v, np.roll(v, -1, axis=0)
+            crossing = (a[:, 1] <= lat) != (b[:, 1] <= lat)
+            x = a[crossing, 0] + (lat - a[crossing, 1]) * (b[crossing, 0] - a[crossing, 0]) / (b[crossing, 1] - a[crossing, 1])
+            inside ^= bool(np.count_nonzero(x > lng) % 2)
+        if inside:
+            return zone
+    return None
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Offline position -> time zone lookup benchmark")
+    parser.add_argument("--points", type=int, default=100_000, help="number of random coordinates")
+    parser.add_argument("--index", default=None, help="boundary file (.npz or GeoJSON)")
+    parser.add_argument("--check", type=int, default=2_000, help="lookups verified by brute force (synthetic only)")
+    args = parser.parse_args()
+
+    polygons = None
+    index = load_geo_index(args.index)
+
+    if index is None:
+        print("no boundary data found, using a synthetic world")
+        polygons = synthetic_polygons()
+        t0 = time.perf_counter()
+        index = TZ_Geo_Index.from_polygons(polygons)
+        print(f"index built in {time.perf_counter() - t0:.2f} s")
+
+    print(f"index: {index.stats()}")
+
+    rng = np.random.default_rng(1)
+    lats = rng.uniform(-89.0, 89.0, args.points).tolist()
+    lngs = rng.uniform(-180.0, 180.0, args.points).tolist()
+
+    latencies = np.empty(args.points)
+    found = 0
+
+    t_start = time.perf_counter()
+    for i, (lat, lng) in enumerate(zip(lats, lngs)):
+        t0 = time.perf_counter()
+        zone = index.lookup(lat, lng)
+        latencies[i] = time.perf_counter() - t0
+        found += zone is not None
+    total = time.perf_counter() - t_start
+
+    us = latencies * 1e6
+    print(f"{args.points} lookups in {total:.2f} s ({args.points / total:,.0f}/s), {found} inside a zone")
+    print(f"latency: mean {us.mean():.1f} us, p50 {np.percentile(us, 50):.1f} us, "
+          f"p99 {np.percentile(us, 99):.1f} us, max {us.max():.1f} us")
+
+    if polygons is not None and args.check:
+        mismatches = 0
+        for lat, lng in zip(lats[:args.check], lngs[:args.check]):
+            if index.lookup(lat, lng) != brute_force(polygons, lat, lng):
+                mismatches += 1
+        print(f"brute-force check: {mismatches} mismatches in {min(args.check, args.points)} lookups")
+
+
+if __name__ == "__main__":
+    main()
@@ -34,6 +34,9 @@ class InfluxDB_Access():
         self.client = None
         self.log_influx_db_dir = os.getcwd()
 
+        # buckets already known to exist (avoids a buckets API call per write)
+        self.known_buckets = set()
+
         self.boilerplate_cols = [
             'result',
             'table',
@@ -208,6 +211,28 @@ class InfluxDB_Access():
 
     def __write_data(self, data_list, bucket_name):
 
+        status, output = self.__ensure_bucket(bucket_name)
+        if not status:
+            return False, output
+
+        # the write API waits for the server to confirm that the data was written successfully before
+        # returning control back to the caller. This means that the write operation is synchronous
+        # i.e., the write API is blocked until the write operation is completed.
+
+        try:
+            write_api = self.client.write_api(write_options=SYNCHRONOUS)
+            write_api.write(bucket=bucket_name, record=data_list)
+        except Exception as E:
+            return False, f"cannot write to bucket {bucket_name}: {E}"
+
+        return True, None
+
+
+    def __ensure_bucket(self, bucket_name):
+
+        if bucket_name in self.known_buckets:
+            return True, None
+
         status, output = self.get_database_names()
         if not status:
             return False, output
@@ -234,16 +259,7 @@ class InfluxDB_Access():
         except Exception as E:
             return False, f"cannot create bucket {bucket_name}: {E}"
 
-        # the write API waits for the server to confirm that the data was written successfully before
-        # returning control back to the caller. This means that the write operation is synchronous
-        # i.e., the write API is blocked until the write operation is completed.
-
-        try:
-            write_api = self.client.write_api(write_options=SYNCHRONOUS)
-            write_api.write(bucket=bucket_name, record=data_list)
-        except Exception as E:
-            return False, f"cannot write to bucket {bucket_name}: {E}"
-
+        self.known_buckets.add(bucket_name)
         return True, None
 
     #############
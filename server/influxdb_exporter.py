@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+
+# Author: Mani Amoozadeh
+# Email: mani.amoozadeh2@gmail.com
+
+import queue
+import atexit
+import logging
+import threading
+import time
+import datetime
+
+from influxdb_access import InfluxDB_Access, influx_url
+
+log = logging.getLogger(__name__)
+
+
+class InfluxDB_Exporter():
+    """
+    Background exporter that batches data points to InfluxDB.
+
+    Producers call submit() which only enqueues the point (never blocks).
+    A single worker thread owns one long-lived InfluxDB client and flushes
+    the queue whenever batch_size points are pending or flush_interval
+    seconds have elapsed. When the queue is full, new points are dropped
+    and counted.
+
+    Besides raw points, the exporter keeps in-process counters and gauges
+    (see incr_counter and set_gauge) that are emitted as points on every
+    interval flush.
+    """
+
+    def __init__(self,
+                 url=influx_url,
+                 port=8086,
+                 database_name="mcp_server_home",
+                 timeout=5_000,
+                 max_queue=10_000,
+                 batch_size=500,
+                 flush_interval=5.0):
+        """
+        :param max_queue: maximum number of points buffered in memory
+        :param batch_size: flush as soon as this many points are pending
+        :param flush_interval: flush at least once every this many seconds
+        """
+
+        self.url_port = f"{url}:{port}"
+        self.database_name = database_name
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.influx_obj = None
+
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+
+        self.stop_event = threading.Event()
+        self.flush_event = threading.Event()
+        self.thread = None
+
+
+    def start(self):
+
+        with self.lock:
+
+            if self.thread and self.thread.is_alive():
+                return
+
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self.__run, name="influxdb-exporter", daemon=True)
+            self.thread.start()
+
+        atexit.register(self.stop)
+
+
+    def stop(self, timeout=5.0):
+
+        if not self.thread:
+            return
+
+        self.stop_event.set()
+        self.flush_event.set()
+        self.thread.join(timeout)
+
+
+    def flush(self):
+        """Ask the worker thread to flush pending points now."""
+
+        self.flush_event.set()
+
+
+    def submit(self, data_dict):
+        """
+        Enqueue a data point without blocking.
+        Returns False if the point was dropped because the queue is full.
+        """
+
+        try:
+            self.queue.put_nowait(data_dict)
+        except queue.Full:
+            with self.lock:
+                self.dropped += 1
+            return False
+
+        if self.queue.qsize() >= self.batch_size:
+            self.flush_event.set()
+
+        return True
+
+
+    def incr_counter(self, measurement, tags, field, value=1):
+        """Increment a cumulative counter, emitted on every interval flush."""
+
+        key = (measurement, tuple(sorted(tags.items())))
+
+        with self.lock:
+            fields = self.counters.setdefault(key, {})
+            fields[field] = fields.get(field, 0) + value
+
+
+    def set_gauge(self, measurement, tags, fields):
+        """Set the latest value of a gauge, emitted on every interval flush."""
+
+        key = (measurement, tuple(sorted(tags.items())))
+
+        with self.lock:
+            self.gauges.setdefault(key, {}).update(fields)
+
+
+    def stats(self):
+
+        with self.lock:
+            return {
+                "queued": self.queue.qsize(),
+                "dropped": self.dropped,
+                "written": self.written,
+                "failed": self.failed
+            }
+
+    #############
+
+    def __run(self):
+
+        last_interval = time.monotonic()
+
+        while True:
+
+            self.flush_event.wait(self.flush_interval)
+            self.flush_event.clear()
+
+            stopping = self.stop_event.is_set()
+
+            now = time.monotonic()
+            if stopping or now - last_interval >= self.flush_interval:
+                self.__collect_metrics()
+                last_interval = now
+
+            self.__drain()
+
+            if stopping:
+                return
+
+
+    def __drain(self):
+
+        while True:
+
+            batch = []
+
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            if not batch:
+                return
+
+            self.__write_batch(batch)
+
+            if len(batch) < self.batch_size:
+                return
+
+
+    def __write_batch(self, batch):
+
+        if self.influx_obj is None:
+            try:
+                self.influx_obj = InfluxDB_Access(url=self.url_port, org="home", timeout=self.timeout)
+            except (Exception, SystemExit) as E:
+                log.error("InfluxDB_Exporter: cannot create client: %s", E)
+                with self.lock:
+                    self.failed += len(batch)
+                return
+
+        try:
+            status, output = self.influx_obj.write_data(batch, self.database_name)
+        except Exception as E:
+            status, output = False, str(E)
+
+        with self.lock:
+            if status:
+                self.written += len(batch)
+            else:
+                self.failed += len(batch)
+
+        if not status:
+            log.error("InfluxDB_Exporter: write failed: %s", output)
+
+
+    def __collect_metrics(self):
+
+        data_ts = datetime.datetime.now(datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+        with self.lock:
+            snapshot = list(self.counters.items()) + list(self.gauges.items())
+            exporter_fields = {
+                "dropped": self.dropped,
+                "written": self.written,
+                "failed": self.failed
+            }
+
+        exporter_fields["queued"] = self.queue.qsize()
+        snapshot.append((("mcp_exporter", ()), exporter_fields))
+
+        for (measurement, tags), fields in snapshot:
+
+            data_dict = {
+                "measurement": measurement,
+                "tags": dict(tags) or None,
+                "fields": dict(fields),
+                "time": data_ts
+            }
+
+            if data_dict["tags"] is None:
+                del data_dict["tags"]
+
+            self.submit(data_dict)
+
+
+_exporter = None
+_exporter_lock = threading.Lock()
+
+
+def get_exporter():
+    """Return the process-wide exporter, starting it on first use."""
+
+    global _exporter
+
+    with _exporter_lock:
+        if _exporter is None:
+            _exporter = InfluxDB_Exporter()
+            _exporter.start()
+
+    return _exporter
@@ -1,10 +1,13 @@
 
+import time
 import logging
+from tabulate import tabulate
 
 from mcp.server.fastmcp import FastMCP
 from langchain_mcp_adapters.tools import to_fastmcp
 
 from tools.generate_tools import generate_tools_from_client
+from tools.provider import list_providers
 from tools.tools_duckduckgo import DuckDuckGoSearch
 from tools.tools_stock import LLM_Stock
 from tools.tools_tz import TZ_Info
@@ -12,6 +15,7 @@ from tools.tools_weather import Weather_Info
 from tools.tools_gmail import Gmail_tool
 from tools.tools_calendar import Tool_Calendar
 from tools.tools_spotify import Tool_Spotify
+from tools.tools_status import Server_Status
 
 logging.basicConfig(
     level=logging.INFO,
@@ -24,25 +28,56 @@ log = logging.getLogger(__name__)
 # Suppress HTTP logs
 logging.getLogger("httpx").setLevel(logging.WARNING)
 
+# Per tool family (tool class) isolation: (max concurrency, max queued calls).
+# Slow Google APIs cannot take every worker and starve fast lookups.
+BULKHEADS = {
+    "LLM_Stock":        (6, 24),
+    "Weather_Info":     (4, 16),
+    "TZ_Info":          (4, 16),
+    "Gmail_tool":       (2, 8),
+    "Tool_Calendar":    (2, 8),
+    "Tool_Spotify":     (2, 8),
+    "DuckDuckGoSearch": (2, 8),
+}
+
 
 if __name__ == "__main__":
 
+    timings = []
+
+    # Providers are registered from their signatures only; each class is
+    # instantiated on the first call to one of its tools (or by the
+    # background warm-up below), so a slow OAuth flow or a missing Redis
+    # does not delay or kill the whole server.
+
+    t0 = time.perf_counter()
     tools = generate_tools_from_client([
-        DuckDuckGoSearch(),
-        LLM_Stock(),
-        TZ_Info(),
-        Weather_Info(),
-        Gmail_tool(),
-        Tool_Calendar(),
-        Tool_Spotify()
-    ])
+        DuckDuckGoSearch,
+        LLM_Stock,
+        TZ_Info,
+        Weather_Info,
+        Gmail_tool,
+        Tool_Calendar,
+        Tool_Spotify,
+        Server_Status
+    ], bulkheads=BULKHEADS)
+    timings.append(["generate tools", len(tools), (time.perf_counter() - t0) * 1000.0])
 
+    t0 = time.perf_counter()
     mcp_tools = [to_fastmcp(tool) for tool in tools]
+    timings.append(["convert to FastMCP", len(mcp_tools), (time.perf_counter() - t0) * 1000.0])
 
+    t0 = time.perf_counter()
     mcp = FastMCP(
         "Home-MCP",
         host="0.0.0.0",
         port=8089,
         tools=mcp_tools)
+    timings.append(["create FastMCP", "", (time.perf_counter() - t0) * 1000.0])
+
+    log.info("Startup breakdown:\n%s", tabulate(timings, headers=["Step", "Tools", "Time (ms)"], floatfmt=".1f"))
+
+    for provider in list_providers():
+        provider.warm_up()
 
     mcp.run(transport="streamable-http")
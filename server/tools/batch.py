@@ -0,0 +1,40 @@
+from tabulate import tabulate
+
+from .executor import get_tool_executor
+
+# upper bound of the calls a batch tool makes at the same time
+MAX_BATCH_CONCURRENCY = 8
+
+
+def unique_items(items, normalize=str.strip):
+    """Normalized, non-empty items in the order of the request, without duplicates."""
+
+    if isinstance(items, str):
+        items = [items]
+
+    return list(dict.fromkeys(normalize(str(x)) for x in items if str(x).strip()))
+
+
+def fetch_all(fetch, items, max_concurrency):
+    """
+    fetch(item) -> (status, output) for every item, max_concurrency at a time
+    (clamped to 1..MAX_BATCH_CONCURRENCY) on the shared tool executor.
+    An exception becomes a (False, message) result of its item.
+    """
+
+    max_concurrency = max(1, min(int(max_concurrency), MAX_BATCH_CONCURRENCY))
+
+    def call(item):
+        try:
+            return fetch(item)
+        except Exception as E:
+            return False, str(E)
+
+    return get_tool_executor().map(call, items, max_concurrency)
+
+
+def batch_table(rows, headers, summary):
+    """One comparison table with a row per item, followed by a summary line."""
+
+    table = tabulate(rows, headers=headers, tablefmt="github", disable_numparse=True)
+    return f"{table}\n\n{summary}"
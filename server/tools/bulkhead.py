@@ -0,0 +1,86 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+from influxdb_exporter import get_exporter
+
+log = logging.getLogger(__name__)
+
+
+class BulkheadFull(Exception):
+    """Raised when a tool family has no free slot and its queue is full."""
+
+    def __init__(self, family, max_concurrency, max_queue):
+
+        self.family = family
+        super().__init__(f"'{family}' is saturated "
+                         f"({max_concurrency} calls running, {max_queue} queued), try again later")
+
+
+class Bulkhead():
+    """
+    Concurrency isolation for one tool family (one tool class).
+
+    At most max_concurrency calls of the family run at the same time and at
+    most max_queue calls wait for a slot; further calls are rejected right
+    away. This keeps slow families (e.g. Gmail) from taking every executor
+    worker and starving fast ones (e.g. stock quotes).
+
+    All state is touched from the event loop only, so no lock is needed.
+    """
+
+    def __init__(self, family, max_concurrency, max_queue):
+
+        self.family = family
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.active = 0
+        self.queued = 0
+        self.rejected = 0
+
+
+    @asynccontextmanager
+    async def slot(self):
+
+        if self.active >= self.max_concurrency and self.queued >= self.max_queue:
+            self.rejected += 1
+            get_exporter().incr_counter("mcp_bulkhead_rejected", {"family": self.family}, "count")
+            self.__report()
+            raise BulkheadFull(self.family, self.max_concurrency, self.max_queue)
+
+        self.queued += 1
+        self.__report()
+
+        try:
+            await self.semaphore.acquire()
+        finally:
+            self.queued -= 1
+
+        self.active += 1
+        self.__report()
+
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self.semaphore.release()
+            self.__report()
+
+
+    def stats(self):
+
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "saturation": self.active / self.max_concurrency
+        }
+
+
+    def __report(self):
+
+        get_exporter().set_gauge("mcp_bulkhead", {"family": self.family}, self.stats())
@@ -2,3 +2,12 @@
 def include_as_tool(func):
     func._include_as_tool = True
     return func
+
+
+def fail_fast_on_rate_limit(func):
+    """
+    Return a 'retry after N s' result right away when an upstream rate limit
+    is exhausted, instead of waiting for the window to clear.
+    """
+    func._rate_limit_fail_fast = True
+    return func
@@ -0,0 +1,161 @@
+import os
+import asyncio
+import logging
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+from influxdb_exporter import get_exporter
+
+log = logging.getLogger(__name__)
+
+
+class Tool_Executor():
+    """
+    Bounded thread pool used to run blocking (sync) tool methods off the
+    event loop. Tracks how many calls are waiting for a worker (queued) and
+    how many are running (active), and reports both as the mcp_executor gauge.
+    """
+
+    def __init__(self, max_workers=16):
+
+        self.max_workers = max_workers
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mcp-tool")
+
+        self.lock = threading.Lock()
+        self.queued = 0
+        self.active = 0
+
+
+    async def run(self, func, *args, **kwargs):
+        """Run func(*args, **kwargs) on the pool and await its result."""
+
+        # carry context variables (e.g. the rate limit policy) into the worker thread
+        ctx = contextvars.copy_context()
+        state = {"started": False}
+
+        def call():
+
+            with self.lock:
+                if not state["started"]:
+                    state["started"] = True
+                    self.queued -= 1
+                self.active += 1
+            self.__report()
+
+            try:
+                return ctx.run(func, *args, **kwargs)
+            finally:
+                with self.lock:
+                    self.active -= 1
+                self.__report()
+
+        with self.lock:
+            self.queued += 1
+        self.__report()
+
+        loop = asyncio.get_running_loop()
+
+        try:
+            return await loop.run_in_executor(self.pool, call)
+        except asyncio.CancelledError:
+            # cancelled before a worker picked it up: it will never run
+            with self.lock:
+                if not state["started"]:
+                    state["started"] = True
+                    self.queued -= 1
+            self.__report()
+            raise
+
+
+    def map(self, func, items, max_concurrency):
+        """
+        Run func(item) for every item from a tool already running on the pool,
+        with at most max_concurrency calls at a time; results keep the order
+        of items.
+
+        The calling thread works through the items too, and helpers are only
+        extra pool tasks: when every worker is busy the batch still completes
+        (serially) instead of waiting on itself, and the pool's thread cap is
+        never exceeded.
+        """
+
+        items = list(items)
+        results = [None] * len(items)
+        pending = iter(range(len(items)))
+        pending_lock = threading.Lock()
+
+        def work():
+            while True:
+                with pending_lock:
+                    i = next(pending, None)
+                if i is None:
+                    return
+                results[i] = func(items[i])
+
+        def helper(ctx):
+
+            with self.lock:
+                self.active += 1
+            self.__report()
+
+            try:
+                ctx.run(work)
+            finally:
+                with self.lock:
+                    self.active -= 1
+                self.__report()
+
+        helpers = [self.pool.submit(helper, contextvars.copy_context())
+                   for _ in range(min(max_concurrency, len(items)) - 1)]
+
+        work()
+
+        # helpers still queued have nothing left to do; running ones finish their item
+        for future in helpers:
+            if not future.cancel():
+                future.result()
+
+        return results
+
+
+    def stats(self):
+
+        with self.lock:
+            return {
+                "max_workers": self.max_workers,
+                "queued": self.queued,
+                "active": self.active
+            }
+
+
+    def __report(self):
+
+        get_exporter().set_gauge("mcp_executor", {}, self.stats())
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def configure_tool_executor(max_workers):
+    """Replace the process-wide tool executor (call before serving requests)."""
+
+    global _executor
+
+    with _executor_lock:
+        _executor = Tool_Executor(max_workers=max_workers)
+
+    log.info("tool executor configured with %d workers", max_workers)
+    return _executor
+
+
+def get_tool_executor():
+
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = Tool_Executor(max_workers=int(os.getenv("MCP_TOOL_WORKERS", "16")))
+
+    return _executor
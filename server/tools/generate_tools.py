@@ -1,15 +1,25 @@
 
 import sys
 import re
+import json
 import inspect
+import functools
 import logging
 from typing import Any, Optional
 from pydantic import BaseModel, create_model
 from langchain.tools import StructuredTool
+from apis.rate_limiter import RateLimitExceeded, rate_limit_policy
 from .metrics import instrument
+from .executor import get_tool_executor
+from .bulkhead import Bulkhead, BulkheadFull
+from .provider import Lazy_Provider, register_provider
+from .single_flight import Single_Flight
 
 log = logging.getLogger(__name__)
 
+# identical concurrent tool calls share one upstream execution
+single_flight = Single_Flight()
+
 
 class EmptyInput(BaseModel):
     """Used for methods with no parameters"""
@@ -21,79 +31,162 @@ def normalize_tool_name(name: str) -> str:
     return re.sub(r'[^a-zA-Z0-9_-]', '_', name)
 
 
-def make_wrapper_noarg(method, name: str):
+def rate_limited_result(name: str, error: RateLimitExceeded) -> str:
+    """Structured tool result returned when a fail-fast rate limit is hit."""
 
-    def wrapper(_: Any = None):
+    return json.dumps({
+        "tool": name,
+        "status": "rate_limited",
+        "retry_after_s": round(error.retry_after, 1),
+        "message": f"Tool {name} is rate limited, retry after {error.retry_after:.1f} s"
+    })
 
-        log.info("[TOOL CALL] %s()", name)
 
-        try:
+async def call_method(method, **kwargs):
+    """Await coroutine methods directly; run sync methods on the tool executor."""
+
+    if inspect.iscoroutinefunction(method):
+        return await method(**kwargs)
+
+    return await get_tool_executor().run(method, **kwargs)
+
+
+async def run_tool(method, name: str, fail_fast, bulkhead, kwargs):
+
+    try:
+
+        with rate_limit_policy(fail_fast):
+            if bulkhead is None:
+                status, output = await call_method(method, **kwargs)
+            else:
+                async with bulkhead.slot():
+                    status, output = await call_method(method, **kwargs)
+
+        if not status:
+            log.error("[TOOL ERROR] %s: %s", name, output)
+            return f"Tool {name} failed: {str(output)}"
 
-            status, output = method()
-            if not status:
-                log.error("[TOOL ERROR] %s: %s", name, output)
-                return f"Tool {name} failed: {str(output)}"
+        log.debug("[TOOL RESULT] %s", output)
+        return str(output)
 
-            log.debug("[TOOL RESULT] %s", output)
-            return str(output)
+    except RateLimitExceeded as e:
 
-        except Exception as e:
+        log.warning("[TOOL RATE LIMITED] %s: %s", name, str(e))
+        return rate_limited_result(name, e)
 
-            log.error(f"[TOOL ERROR] {name}: {str(e)}")
-            return f"Tool {name} failed: {str(e)}"
+    except BulkheadFull as e:
+
+        log.warning("[TOOL REJECTED] %s: %s", name, str(e))
+        return f"Tool {name} rejected: {str(e)}"
+
+    except Exception as e:
+
+        log.error("[TOOL ERROR] %s: %s", name, str(e))
+        return f"Tool {name} failed: {str(e)}"
+
+
+def make_wrapper_noarg(method, name: str, bulkhead=None):
+
+    fail_fast = getattr(method, "_rate_limit_fail_fast", None)
+
+    async def wrapper(_: Any = None):
+
+        log.info("[TOOL CALL] %s()", name)
+
+        key = Single_Flight.make_key(name, {})
+        return await single_flight.do(key, lambda: run_tool(method, name, fail_fast, bulkhead, {}))
 
     return instrument(name)(wrapper)
 
 
-def make_wrapper(method, name: str):
+def make_wrapper(method, name: str, bulkhead=None, defaults=None):
 
-    def wrapper(**kwargs):
+    fail_fast = getattr(method, "_rate_limit_fail_fast", None)
+    defaults = defaults or {}
+
+    async def wrapper(**kwargs):
 
         log.info("[TOOL CALL] %s(%s)", name, kwargs)
 
-        try:
+        # omitted arguments and explicit defaults are the same call
+        key = Single_Flight.make_key(name, {**defaults, **kwargs})
+        return await single_flight.do(key, lambda: run_tool(method, name, fail_fast, bulkhead, kwargs))
+
+    return instrument(name)(wrapper)
 
-            status, output = method(**kwargs)
-            if not status:
-                log.error("[TOOL ERROR] %s: %s", name, output)
-                return f"Tool {name} failed: {str(output)}"
 
-            log.debug("[TOOL RESULT] %s", output)
-            return str(output)
+def bind_lazy_method(provider, name: str, func):
+    """
+    Build a callable for tool 'name' that resolves the provider instance
+    on call. Keeps the tool attributes (e.g. _rate_limit_fail_fast) of func.
+    """
 
-        except Exception as e:
+    if inspect.iscoroutinefunction(func):
 
-            log.error("[TOOL ERROR] %s: %s", name, str(e))
-            return f"Tool {name} failed: {str(e)}"
+        @functools.wraps(func)
+        async def method(**kwargs):
+            instance = await get_tool_executor().run(provider.get)
+            return await getattr(instance, name)(**kwargs)
 
-    return instrument(name)(wrapper)
+    else:
+
+        @functools.wraps(func)
+        def method(**kwargs):
+            return getattr(provider.get(), name)(**kwargs)
+
+    return method
 
 
-def generate_tools_from_client(client_instance):
+def generate_tools_from_client(client_instance, bulkheads=None):
+    """
+    :param client_instance: list of tool classes or tool class instances.
+                            Classes are registered from their signatures only
+                            and instantiated on the first call to one of their tools.
+    :param bulkheads: optional {class name: (max_concurrency, max_queue)};
+                      tools of a listed class share one Bulkhead
+    """
 
     if not isinstance(client_instance, list):
         log.error("client_instance is not of type list")
         sys.exit(1)
 
+    bulkheads = bulkheads or {}
+
     members_all = []
-    for instance in client_instance:
-        members = inspect.getmembers(instance, predicate=inspect.ismethod)
-        members_all.extend(members)
+    for entry in client_instance:
+
+        if inspect.isclass(entry):
+            provider = Lazy_Provider(entry)
+        else:
+            provider = Lazy_Provider(type(entry), instance=entry)
+
+        register_provider(provider)
+
+        bulkhead = None
+        if provider.name in bulkheads:
+            max_concurrency, max_queue = bulkheads[provider.name]
+            bulkhead = Bulkhead(provider.name, max_concurrency, max_queue)
+
+        members = inspect.getmembers(provider.cls, predicate=inspect.isfunction)
+        members_all.extend((name, func, provider, bulkhead) for name, func in members)
 
     tools = []
 
-    for name, method in members_all:
+    for name, func, provider, bulkhead in members_all:
 
-        if name.startswith("_") or not getattr(method, "_include_as_tool", False):
+        if name.startswith("_") or not getattr(func, "_include_as_tool", False):
             continue
 
-        sig = inspect.signature(method)
-        params = sig.parameters
-        description = inspect.getdoc(method) or "No description provided."
+        method = bind_lazy_method(provider, name, func)
+
+        # drop 'self': the schema is built from the unbound signature
+        sig = inspect.signature(func)
+        params = dict(list(sig.parameters.items())[1:])
+        description = inspect.getdoc(func) or "No description provided."
 
         if len(params) == 0:
             args_schema = EmptyInput
-            func_wrapper = make_wrapper_noarg(method, name)
+            func_wrapper = make_wrapper_noarg(method, name, bulkhead)
         else:
             fields = {}
             for param in params.values():
@@ -106,13 +199,19 @@ def generate_tools_from_client(client_instance):
 
                 fields[param.name] = (annotation, default)
 
+            defaults = {
+                param.name: param.default
+                for param in params.values()
+                if param.default != inspect._empty
+            }
+
             args_schema = create_model(f"{name.title()}Input", **fields)
-            func_wrapper = make_wrapper(method, name)
+            func_wrapper = make_wrapper(method, name, bulkhead, defaults)
 
         tool = StructuredTool.from_function(
             name=normalize_tool_name(name),
             description=description,
-            func=func_wrapper,
+            coroutine=func_wrapper,
             args_schema=args_schema
         )
 
@@ -8,7 +8,7 @@ import datetime
 from functools import wraps
 from typing import Callable
 
-from influxdb_access import InfluxDB_Access
+from influxdb_exporter import get_exporter
 
 log = logging.getLogger(__name__)
 
@@ -47,9 +47,9 @@ def instrument(tool_name: str):
                         "time": data_ts
                     }
 
-                    status, output = InfluxDB_Access.write_points(data_dict)
-                    if not status:
-                        log.error("write_points failed: %s", output)
+                    # non-blocking: the exporter batches writes in the background
+                    if not get_exporter().submit(data_dict):
+                        log.debug("metrics queue full, dropped point for %s", tool_name)
 
             return aw
 
@@ -80,9 +80,9 @@ def instrument(tool_name: str):
                         "time": data_ts
                     }
 
-                    status, output = InfluxDB_Access.write_points(data_dict)
-                    if not status:
-                        log.error("write_points failed: %s", output)
+                    # non-blocking: the exporter batches writes in the background
+                    if not get_exporter().submit(data_dict):
+                        log.debug("metrics queue full, dropped point for %s", tool_name)
 
             return sw
 
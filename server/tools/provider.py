@@ -0,0 +1,121 @@
+import time
+import logging
+import threading
+
+log = logging.getLogger(__name__)
+
+
+class ProviderUnavailable(Exception):
+    """Raised when a tool class could not be instantiated."""
+
+    def __init__(self, name, error):
+
+        self.name = name
+        self.error = error
+        super().__init__(f"provider {name} is unavailable: {error}")
+
+
+class Lazy_Provider():
+    """
+    Holds one tool class and instantiates it on the first call to one of
+    its tools, so a slow or broken dependency (OAuth, Redis, ...) neither
+    delays server startup nor takes the other providers down.
+
+    States: registered -> initializing -> ready | failed.
+    A failed provider is retried on a later call, at most once every
+    retry_interval seconds.
+    """
+
+    def __init__(self, cls, instance=None, retry_interval=30.0):
+
+        self.cls = cls
+        self.name = cls.__name__
+        self.retry_interval = retry_interval
+
+        self.lock = threading.Lock()
+        self.instance = instance
+        self.state = "ready" if instance is not None else "registered"
+        self.error = None
+        self.failed_at = None
+        self.init_ms = 0.0 if instance is not None else None
+
+
+    def get(self):
+        """Return the instance, creating it if needed (blocking, thread-safe)."""
+
+        if self.instance is not None:
+            return self.instance
+
+        with self.lock:
+
+            if self.instance is not None:
+                return self.instance
+
+            if self.failed_at is not None and time.monotonic() - self.failed_at < self.retry_interval:
+                raise ProviderUnavailable(self.name, self.error)
+
+            self.state = "initializing"
+            log.info("initializing provider %s", self.name)
+
+            t0 = time.perf_counter()
+
+            try:
+                instance = self.cls()
+            except (Exception, SystemExit) as E:
+                self.init_ms = (time.perf_counter() - t0) * 1000.0
+                self.state = "failed"
+                if isinstance(E, SystemExit):
+                    self.error = f"exited during initialization (code {E.code}), see server log"
+                else:
+                    self.error = str(E) or type(E).__name__
+                self.failed_at = time.monotonic()
+                log.error("provider %s failed to initialize: %s", self.name, self.error)
+                raise ProviderUnavailable(self.name, self.error)
+
+            self.init_ms = (time.perf_counter() - t0) * 1000.0
+            self.state = "ready"
+            self.error = None
+            self.failed_at = None
+            self.instance = instance
+
+            log.info("provider %s ready in %.1f ms", self.name, self.init_ms)
+
+        return self.instance
+
+
+    def warm_up(self):
+        """Initialize in a background thread; errors are only recorded."""
+
+        def run():
+            try:
+                self.get()
+            except ProviderUnavailable:
+                pass
+
+        threading.Thread(target=run, name=f"warm-up-{self.name}", daemon=True).start()
+
+
+    def status(self):
+
+        return {
+            "provider": self.name,
+            "state": self.state,
+            "init_ms": self.init_ms,
+            "error": self.error
+        }
+
+
+_providers = {}
+_providers_lock = threading.Lock()
+
+
+def register_provider(provider):
+
+    with _providers_lock:
+        _providers[provider.name] = provider
+
+
+def list_providers():
+
+    with _providers_lock:
+        return list(_providers.values())
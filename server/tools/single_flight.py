@@ -0,0 +1,53 @@
+import json
+import asyncio
+import logging
+
+from influxdb_exporter import get_exporter
+
+log = logging.getLogger(__name__)
+
+
+class Single_Flight():
+    """
+    Coalesce identical in-flight calls: while a call for a given key is
+    running, later callers with the same key wait for that execution and
+    share its result instead of starting their own.
+
+    The shared execution runs as its own task, so a cancelled caller does
+    not cancel it for the others. Used from the event loop only.
+    """
+
+    def __init__(self):
+
+        self.calls = {}
+        self.coalesced = 0
+
+
+    @staticmethod
+    def make_key(name, kwargs):
+        """Key of a call: the tool name plus its arguments in canonical form."""
+
+        return name, json.dumps(kwargs, sort_keys=True, default=str)
+
+
+    async def do(self, key, coro_fn):
+        """Return the result of coro_fn(), shared with concurrent callers of the same key."""
+
+        task = self.calls.get(key)
+
+        if task is not None:
+            self.coalesced += 1
+            get_exporter().incr_counter("mcp_tool_coalesced", {"tool": key[0]}, "count")
+            log.info("[TOOL COALESCED] %s", key[0])
+            return await asyncio.shield(task)
+
+        task = asyncio.ensure_future(coro_fn())
+        self.calls[key] = task
+
+        def forget(done_task):
+            if self.calls.get(key) is done_task:
+                del self.calls[key]
+
+        task.add_done_callback(forget)
+
+        return await asyncio.shield(task)
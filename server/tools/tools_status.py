@@ -0,0 +1,30 @@
+import logging
+from tabulate import tabulate
+
+from tools.decorator import include_as_tool
+from tools.provider import list_providers
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+log = logging.getLogger(__name__)
+
+
+class Server_Status():
+
+    @include_as_tool
+    def provider_status(self):
+        """
+        Report the readiness of every tool provider of this MCP server.
+
+        Returns:
+        One row per provider with its state (registered, initializing, ready or failed),
+        the time its initialization took and the last error, if any.
+        """
+
+        rows = []
+        for provider in list_providers():
+            info = provider.status()
+            init_ms = "-" if info["init_ms"] is None else f"{info['init_ms']:.1f}"
+            rows.append([info["provider"], info["state"], init_ms, info["error"] or ""])
+
+        headers = ["Provider", "State", "Init (ms)", "Error"]
+        return True, tabulate(rows, headers=headers, tablefmt="github")
@@ -3,7 +3,9 @@ import logging
 from datetime import datetime, timezone
 
 from apis.finnhubClient import Finnhub_REST_API_Client
-from tools.decorator import include_as_tool
+from apis.rate_limiter import RateLimitExceeded, rate_limit_policy
+from tools.decorator import include_as_tool, fail_fast_on_rate_limit
+from tools.batch import unique_items, fetch_all, batch_table
 
 logging.basicConfig(level=logging.INFO, format="%(message)s")
 log = logging.getLogger(__name__)
@@ -15,6 +17,9 @@ class LLM_Stock():
 
         self.fh_client = Finnhub_REST_API_Client(url="https://finnhub.io/api", api_ver="v1")
 
+        # load (or download) the US symbol list off the request path
+        self.fh_client.symbol_master.warm("US")
+
 
     @include_as_tool
     def symbol_lookup(self, query):
@@ -25,9 +30,13 @@ class LLM_Stock():
         - query (str): The search term (e.g., 'apple', 'tesla').
         """
 
-        ok, output = self.fh_client.symbol_lookup(query)
-        if not ok:
-            return False, output
+        # answered from the local symbol list when possible, else by the search endpoint
+        output = self.fh_client.symbol_master.search(query, limit=1)
+
+        if not output:
+            ok, output = self.fh_client.symbol_lookup(query)
+            if not ok:
+                return False, output
 
         if not output:
             return False, f"No matching symbols found for '{query}'."
@@ -51,7 +60,7 @@ class LLM_Stock():
     #################
 
     @include_as_tool
-    def stock_symbols(self, exchange="US", currency="USD", max_items:int=5):
+    def stock_symbols(self, exchange="US", currency="USD", max_items:int=5, query=None, security_type=None):
         """
         List supported stock symbols for a given exchange and optional currency filter.
 
@@ -59,16 +68,55 @@ class LLM_Stock():
         - exchange (str): Exchange code (e.g., 'US', 'TO', 'HK').
         - currency (str, optional): Filter by currency (e.g., 'USD', 'CAD').
         - max_items (int, optional): Maximum number of stock symbols to display. Default is 5.
+        - query (str, optional): Only symbols matching this name or ticker (e.g., 'semiconductor', 'BRK').
+        - security_type (str, optional): Only this security type (e.g., 'Common Stock', 'ETP', 'ADR').
         """
 
-        ok, output = self.fh_client.stock_symbols(exchange, currency)
-        if not ok:
-            return False, output
+        # filtered in-process over the local symbol list when it is available
+        selected = self.fh_client.symbol_master.select(exchange, currency=currency, security_type=security_type,
+                                                       query=query, limit=max_items)
+
+        if selected is not None:
+            total, output = selected
+        else:
+            # no local list yet: stream the upstream list and stop after max_items matches
+            ok, items = self.fh_client.stock_symbols_iter(exchange, currency)
+            if not ok:
+                return False, items
+
+            words = query.casefold().split() if query else []
+
+            def matches(x):
+                if not isinstance(x, dict):
+                    return False
+                if security_type and str(x.get("type", "")).casefold() != security_type.casefold():
+                    return False
+                if query:
+                    return query.upper() == x.get("symbol") or all(w in str(x.get("description", "")).casefold() for w in words)
+                return True
+
+            output = []
+            try:
+                for info in items:
+                    if matches(info):
+                        output.append(info)
+                        if len(output) >= max_items:
+                            break
+            except ValueError as E:
+                return False, f"Cannot parse the symbol list of '{exchange}': {E}"
+            finally:
+                items.close()
+
+            # the rest of the list is not read, so the total is not known
+            total = None
 
-        if not isinstance(output, list):
-            return False, f"Unexpected output type: {type(output)}"
+        if not output:
+            return False, f"No matching symbols found on '{exchange}'."
 
-        output_str = "Matched Stocks:"
+        if total is None:
+            output_str = f"Matched Stocks (first {len(output)}):"
+        else:
+            output_str = f"Matched Stocks ({min(max_items, total)} of {total}):"
         for info in output[:max_items]:
             output_str += (
                 f"\n\n"
@@ -89,6 +137,7 @@ class LLM_Stock():
 
 
     @include_as_tool
+    @fail_fast_on_rate_limit
     def market_status(self, exchange="US"):
         """
         Check if the specified market exchange is currently open or closed.
@@ -199,7 +248,8 @@ class LLM_Stock():
         - metric (str): Financial metric to retrieve (e.g., 'valuation', 'margin', 'all').
         """
 
-        ok, output = self.fh_client.company_basic_financials(symbol, metric)
+        # only the latest values are shown: the historical series is not downloaded into memory
+        ok, output = self.fh_client.company_basic_financials(symbol, metric, series=False)
         if not ok:
             return False, output
 
@@ -436,6 +486,7 @@ class LLM_Stock():
 
 
     @include_as_tool
+    @fail_fast_on_rate_limit
     def company_quote(self, symbol):
         """
         Get the current stock price and related performance metrics.
@@ -468,6 +519,112 @@ class LLM_Stock():
         return True, output_str
 
 
+    @include_as_tool
+    @fail_fast_on_rate_limit
+    def company_quotes(self, symbols: list, max_concurrency: int=4):
+        """
+        Compare the current stock quotes of several symbols in one call.
+
+        Parameters:
+        - symbols (list of str): Stock ticker symbols (e.g., ["AAPL", "MSFT", "NVDA"]).
+        - max_concurrency (int, optional): Number of quotes fetched at the same time (1 to 8). Default is 4.
+
+        Returns:
+        - One comparative table with a row per symbol, followed by how many
+          quotes were served. Symbols are answered from the cache first; the
+          others are fetched within the remaining API rate limit budget, and
+          symbols beyond it are listed as skipped with a retry hint:
+
+            | Symbol   | Price    | Change   | Change %   | Open     | High     | Low      | Prev Close   | Status                          |
+            |----------|----------|----------|------------|----------|----------|----------|--------------|---------------------------------|
+            | AAPL     | $227.52  | +1.20    | +0.53%     | $226.10  | $228.00  | $225.80  | $226.32      | cached                          |
+            | MSFT     | $415.10  | -2.35    | -0.56%     | $417.00  | $418.20  | $414.50  | $417.45      | live                            |
+            | NVDA     |          |          |            |          |          |          |              | skipped: rate limit, retry in 12 s |
+
+            2 of 3 quotes served (1 cached, 1 live), as of 2025-10-17 19:59 UTC
+        """
+
+        if isinstance(symbols, str):
+            symbols = symbols.split(",")
+
+        symbols = unique_items(symbols, normalize=lambda x: x.strip().upper())
+        if not symbols:
+            return False, "No symbols provided."
+
+        results = {}
+
+        # cache hits take no rate limit slot
+        for symbol in symbols:
+            hit = self.fh_client.cached_quote(symbol)
+            if hit is not None:
+                results[symbol] = (hit[0], hit[1], "cached")
+
+        missing = [s for s in symbols if s not in results]
+
+        # plan the live fetches against what is left of the rate limit window
+        try:
+            budget, retry_after = self.fh_client.rate_limiter.remaining()
+        except Exception as E:
+            log.warning("company_quotes: rate limit budget unavailable: %s", E)
+            budget, retry_after = len(missing), 0
+
+        to_fetch = missing[:budget]
+        for symbol in missing[budget:]:
+            results[symbol] = (False, f"skipped: rate limit, retry in {max(retry_after, 1):.0f} s", "")
+
+        def fetch(symbol):
+            # the budget is shared with other callers: never wait for a slot here
+            with rate_limit_policy(True):
+                try:
+                    return self.fh_client.quote(symbol)
+                except RateLimitExceeded as E:
+                    return False, f"skipped: rate limit, retry in {max(E.retry_after, 1):.0f} s"
+
+        for symbol, (status, output) in zip(to_fetch, fetch_all(fetch, to_fetch, max_concurrency)):
+            results[symbol] = (status, output, "live")
+
+        rows = []
+        served = {"cached": 0, "live": 0}
+        latest = 0
+
+        for symbol in symbols:
+
+            status, output, source = results[symbol]
+
+            if status and isinstance(output, dict) and not output.get("t"):
+                # Finnhub answers unknown symbols with an all-zero quote
+                status, output = False, "unknown symbol"
+
+            if not status or not isinstance(output, dict):
+                message = output if str(output).startswith("skipped") else f"failed: {output}"
+                rows.append([symbol, "", "", "", "", "", "", "", message])
+                continue
+
+            served[source] += 1
+            latest = max(latest, output.get("t") or 0)
+
+            rows.append([
+                symbol,
+                f"${output.get('c', 0):.2f}",
+                f"{output.get('d') or 0:+.2f}",
+                f"{output.get('dp') or 0:+.2f}%",
+                f"${output.get('o', 0):.2f}",
+                f"${output.get('h', 0):.2f}",
+                f"${output.get('l', 0):.2f}",
+                f"${output.get('pc', 0):.2f}",
+                source
+            ])
+
+        headers = ["Symbol", "Price", "Change", "Change %", "Open", "High", "Low", "Prev Close", "Status"]
+
+        summary = (f"{served['cached'] + served['live']} of {len(symbols)} quotes served "
+                   f"({served['cached']} cached, {served['live']} live)")
+        if latest:
+            summary += f", as of {datetime.fromtimestamp(latest, tz=timezone.utc).strftime('%Y-%m-%d %H:%M UTC')}"
+
+        return True, batch_table(rows, headers, summary)
+
+
     ##################
     ##### Crypto #####
     ##################
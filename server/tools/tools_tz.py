@@ -1,5 +1,10 @@
 
 import logging
+import zoneinfo
+import numpy as np
+from datetime import datetime, timezone
+from tabulate import tabulate
+
 from apis.tz_db_client import TZ_DB_REST_API_Client
 from tools.decorator import include_as_tool
 
@@ -9,6 +14,14 @@ log = logging.getLogger(__name__)
 
 class TZ_Info():
 
+    # max rows of a world_clock grid
+    MAX_GRID_ROWS = 48
+
+    # resolution of meeting_planner windows
+    PLANNER_STEP_MINUTES = 15
+
+    WEEKDAYS = np.array(["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"])
+
     def __init__(self):
 
         self.tz_client = TZ_DB_REST_API_Client(url="http://vip.timezonedb.com", api_ver="v2.1")
@@ -20,8 +33,10 @@ class TZ_Info():
         List available time zones.
 
         Parameters:
-        - country_code (optional): A valid ISO 3166-1 alpha-2 country code (e.g., "US", "IN", "AU").
-        - zone_name (optional): Specific time zone name (e.g., "America/Los_Angeles", "Asia/Kolkata").
+        - country_code (optional): A valid ISO 3166-1 alpha-2 country code (e.g., "US", "IN", "AU") or a country name (e.g., "Germany").
+        - zone_name (optional): Time zone name (e.g., "America/Los_Angeles", "Asia/Kolkata"), a prefix (e.g., "Europe/", "America/*"),
+          or a city name, possibly misspelled (e.g., "los angeles", "Kolkatta").
+        - max_entries (optional): Maximum number of zones returned. Default is 10.
 
         Returns:
         A list of time zone records. Each record contains:
@@ -54,6 +69,9 @@ class TZ_Info():
             )
             lines.append(line)
 
+        if len(output) > max_entries:
+            lines.append(f"... and {len(output) - max_entries} more zones (increase max_entries to see them)")
+
         output = "\n\n".join(lines)
 
         return True, output
@@ -147,6 +165,237 @@ class TZ_Info():
         return True, output
 
 
+    @include_as_tool
+    def world_clock(self, zones: list, at=None, base_zone="UTC", hours: int=0, step_minutes: int=60):
+        """
+        Convert a time to many time zones at once, computed locally (DST-aware).
+        Use it for questions like "what time is 3pm PT in Berlin, Tokyo and Mumbai next Tuesday?".
+
+        Parameters:
+        - zones (list of str): Zone names, abbreviations or cities (e.g., ["Europe/Berlin", "Tokyo", "Mumbai"]).
+        - at (str, optional): Time in base_zone, "YYYY-MM-DD HH:MM" or "HH:MM" (today). Default is now.
+        - base_zone (str, optional): Zone of 'at' (e.g., "PT", "America/Los_Angeles"). Default is "UTC".
+        - hours (int, optional): 0 (default) converts a single instant; N > 0 returns a grid of the next N hours.
+        - step_minutes (int, optional): Step of the grid. Default is 60.
+
+        Returns:
+        - A table with the local time of each zone:
+
+            | Zone                | Local Time       | Abbreviation   | UTC Offset   |
+            |---------------------|------------------|----------------|--------------|
+            | America/Los_Angeles | Tue 2025-08-12 15:00 | PDT        | -07:00       |
+            | Europe/Berlin       | Wed 2025-08-13 00:00 | CEST       | +02:00       |
+        """
+
+        local = self.tz_client.local
+        if local is None:
+            return False, "local time zone database is disabled"
+
+        names = [base_zone] + self._as_list(zones)
+        resolved, unknown = self._resolve_zones(names)
+        if unknown:
+            return False, f"unknown time zone(s): {', '.join(unknown)}"
+
+        base, zone_list = resolved[0], list(dict.fromkeys(resolved))
+
+        try:
+            start = self._parse_zone_time(at, base) if at else int(datetime.now(timezone.utc).timestamp()) // 60 * 60
+        except ValueError as E:
+            return False, str(E)
+
+        steps = 1 if hours <= 0 else min(int(hours * 60 // max(step_minutes, 1)) + 1, self.MAX_GRID_ROWS)
+        ts = start + np.arange(steps, dtype=np.int64) * max(step_minutes, 1) * 60
+
+        local_ts, abbreviations = local.local_grid(zone_list, ts)
+        labels = self._format_local(local_ts)
+
+        if steps == 1:
+            rows = []
+            for z, zone in enumerate(zone_list):
+                offset = int(local_ts[z, 0] - ts[0])
+                rows.append([zone, labels[z, 0], abbreviations[z, 0], self._format_offset(offset)])
+            return True, tabulate(rows, headers=["Zone", "Local Time", "Abbreviation", "UTC Offset"], tablefmt="github")
+
+        rows = [[labels[z, t] + f" {abbreviations[z, t]}" for z in range(len(zone_list))] for t in range(steps)]
+        return True, tabulate(rows, headers=zone_list, tablefmt="github")
+
+
+    @include_as_tool
+    def meeting_planner(self,
+                        zones: list,
+                        date=None,
+                        days: int=1,
+                        work_start="09:00",
+                        work_end="17:00",
+                        min_minutes: int=30):
+        """
+        Find the windows when every given time zone is within business hours, computed locally (DST-aware).
+
+        Parameters:
+        - zones (list of str): Zone names, abbreviations or cities (e.g., ["America/Los_Angeles", "Berlin", "Mumbai"]).
+        - date (str, optional): First day "YYYY-MM-DD", in the first zone's calendar. Default is today.
+        - days (int, optional): Number of days searched (1 to 14). Default is 1.
+        - work_start (str, optional): Start of the local working day "HH:MM". Default is "09:00".
+        - work_end (str, optional): End of the local working day "HH:MM". Default is "17:00".
+        - min_minutes (int, optional): Shortest window reported. Default is 30.
+
+        Business hours are Monday to Friday, work_start to work_end, local time of each zone.
+
+        Returns:
+        - The overlapping windows, with the local time of each zone:
+
+            **Common business hours** (09:00-17:00 local, Mon-Fri)
+
+            | UTC                    | America/New_York   | Europe/Berlin   | Minutes   |
+            |------------------------|--------------------|-----------------|-----------|
+            | Tue 2025-08-12 13:00   | 09:00-11:00 EDT    | 15:00-17:00 CEST | 120      |
+
+          When there is no common window, the windows covering the most zones are listed instead.
+        """
+
+        local = self.tz_client.local
+        if local is None:
+            return False, "local time zone database is disabled"
+
+        zone_list, unknown = self._resolve_zones(self._as_list(zones))
+        if unknown:
+            return False, f"unknown time zone(s): {', '.join(unknown)}"
+        if not zone_list:
+            return False, "No time zones provided."
+
+        zone_list = list(dict.fromkeys(zone_list))
+
+        try:
+            start_minute = self._parse_minutes(work_start)
+            end_minute = self._parse_minutes(work_end)
+            day = date or datetime.now(zoneinfo.ZoneInfo(zone_list[0])).strftime("%Y-%m-%d")
+            start = self._parse_zone_time(f"{day} 00:00", zone_list[0])
+        except ValueError as E:
+            return False, str(E)
+
+        if end_minute <= start_minute:
+            return False, "work_end must be after work_start"
+
+        step = self.PLANNER_STEP_MINUTES * 60
+        days = max(1, min(int(days), 14))
+        ts = start + np.arange(days * 24 * 3600 // step, dtype=np.int64) * step
+
+        in_hours = local.business_hours(zone_list, ts, start_minute, end_minute)
+        coverage = in_hours.sum(axis=0)
+
+        best = int(coverage.max())
+        if best == 0:
+            return False, "No business hours in the requested days (weekend?)."
+
+        # runs of consecutive steps at the best coverage (all zones when possible)
+        target = coverage == best
+        edges = np.diff(np.r_[0, target.astype(np.int8), 0])
+        run_starts = np.flatnonzero(edges == 1)
+        run_ends = np.flatnonzero(edges == -1)
+
+        min_steps = max(1, -(-int(min_minutes) * 60 // step))
+        keep = (run_ends - run_starts) >= min_steps
+        run_starts, run_ends = run_starts[keep], run_ends[keep]
+
+        if not len(run_starts):
+            return False, f"No window of at least {min_minutes} minutes found."
+
+        window_ts = np.r_[ts[run_starts], ts[run_ends - 1] + step]
+        local_ts, abbreviations = local.local_grid(zone_list, window_ts)
+        n = len(run_starts)
+
+        rows = []
+        for w in range(n):
+            row = [self._format_local(np.array([ts[run_starts[w]]]))[0]]
+            for z in range(len(zone_list)):
+                begin = self._format_local(local_ts[z, w:w + 1], "%H:%M")[0]
+                end = self._format_local(local_ts[z, n + w:n + w + 1], "%H:%M")[0]
+                out = "" if in_hours[z, run_starts[w]] else " (off hours)"
+                row.append(f"{begin}-{end} {abbreviations[z, w]}{out}")
+            row.append(int(run_ends[w] - run_starts[w]) * self.PLANNER_STEP_MINUTES)
+            rows.append(row)
+
+        title = "**Common business hours**" if best == len(zone_list) else \
+            f"**No common business hours; best windows cover {best} of {len(zone_list)} zones**"
+
+        table = tabulate(rows, headers=["UTC"] + zone_list + ["Minutes"], tablefmt="github")
+
+        return True, f"{title} ({work_start}-{work_end} local, Mon-Fri)\n\n{table}"
+
+
+    def _as_list(self, zones):
+
+        if isinstance(zones, str):
+            return [x.strip() for x in zones.split(",") if x.strip()]
+        return [str(x).strip() for x in zones or [] if str(x).strip()]
+
+
+    def _resolve_zones(self, names):
+
+        resolved = []
+        unknown = []
+
+        for name in names:
+            zone = self.tz_client.local.resolve_zone(name)
+            if zone is None:
+                unknown.append(name)
+            else:
+                resolved.append(zone)
+
+        return resolved, unknown
+
+
+    def _parse_zone_time(self, value, zone):
+        """'YYYY-MM-DD HH:MM' or 'HH:MM' (today) in zone -> unix time"""
+
+        tz = zoneinfo.ZoneInfo(zone)
+        value = str(value).strip()
+
+        for fmt in ("%Y-%m-%d %H:%M", "%Y-%m-%dT%H:%M", "%H:%M", "%Y-%m-%d"):
+            try:
+                parsed = datetime.strptime(value, fmt)
+                break
+            except ValueError:
+                continue
+        else:
+            raise ValueError(f"invalid time '{value}', expected 'YYYY-MM-DD HH:MM' or 'HH:MM'")
+
+        if fmt == "%H:%M":
+            today = datetime.now(tz)
+            parsed = today.replace(hour=parsed.hour, minute=parsed.minute, second=0, microsecond=0, tzinfo=None)
+
+        return int(parsed.replace(tzinfo=tz).timestamp())
+
+
+    def _parse_minutes(self, value):
+
+        try:
+            parsed = datetime.strptime(str(value).strip(), "%H:%M")
+        except ValueError:
+            raise ValueError(f"invalid time of day '{value}', expected 'HH:MM'")
+
+        return parsed.hour * 60 + parsed.minute
+
+
+    def _format_local(self, local_ts, fmt=None):
+        """Local unix times (any shape) -> 'Tue 2025-08-12 15:00' strings, vectorized."""
+
+        moments = np.asarray(local_ts).astype("datetime64[s]")
+        text = np.datetime_as_string(moments, unit="m")
+
+        if fmt == "%H:%M":
+            return np.array([x[11:16] for x in text.ravel()]).reshape(text.shape)
+
+        weekday = self.WEEKDAYS[(np.asarray(local_ts) // 86400 + 3) % 7]
+        return np.char.add(np.char.add(weekday, " "), np.char.replace(text, "T", " "))
+
+
+    def _format_offset(self, offset):
+
+        sign = "+" if offset >= 0 else "-"
+        return f"{sign}{abs(offset) // 3600:02d}:{abs(offset) % 3600 // 60:02d}"
+
+
 if __name__ == "__main__":
 
     tz_client = TZ_Info()
@@ -1,20 +1,40 @@
 
+import time
 import logging
-from datetime import datetime
+import numpy as np
+from datetime import datetime, timedelta, timezone
+from tabulate import tabulate
 
 from apis.open_weather_client import Open_Weather_REST_API_Client
+from apis.weather_prefetch import Weather_Prefetcher
+from apis.weather_history import Weather_History
+from apis.weather_units import UNITS, convert_units
 from tools.decorator import include_as_tool
+from tools.batch import unique_items, fetch_all, batch_table
 
 logging.basicConfig(level=logging.INFO, format="%(message)s")
 log = logging.getLogger(__name__)
 
+DAY_SECONDS = 24 * 3600
+
 
 class Weather_Info():
 
+    # a 3-hour slot counts as wet from this probability of precipitation
+    PRECIP_POP_THRESHOLD = 0.3
+
+    # max observations listed by get_weather_history (longer ranges are sampled)
+    MAX_HISTORY_ROWS = 24
+
     def __init__(self):
 
         self.w_client = Open_Weather_REST_API_Client(url="https://api.openweathermap.org")
 
+        # keeps the cities of WEATHER_WATCH_LIST warm in the cache
+        self.prefetcher = Weather_Prefetcher.from_env(self.w_client)
+        if self.prefetcher:
+            self.prefetcher.start()
+
 
     @include_as_tool
     def get_current_weather(self, city_name=None, city_id=None, zip_code=None, unit="imperial"):
@@ -65,6 +85,7 @@ class Weather_Info():
         wind = data.get("wind", {})
 
         unit_symbol = self._get_unit_symbol(unit)
+        speed_unit = self._get_speed_unit(unit)
 
         parts = [f"**Weather in {city}, {country}**"]
         if weather_desc:
@@ -81,25 +102,237 @@ class Weather_Info():
         if "grnd_level" in main:
             parts.append(f"- Ground Level Pressure: {main['grnd_level']} hPa")
         if "speed" in wind:
-            wind_str = f"- Wind: {wind['speed']} m/s"
+            wind_str = f"- Wind: {wind['speed']} {speed_unit}"
             if "deg" in wind:
                 wind_str += f" from {wind['deg']}°"
             if "gust" in wind:
-                wind_str += f" (gusts up to {wind['gust']} m/s)"
+                wind_str += f" (gusts up to {wind['gust']} {speed_unit})"
             parts.append(wind_str)
 
         return "\n".join(parts)
 
 
+    @include_as_tool
+    def get_weather_multi(self, locations: list, unit="imperial", max_concurrency: int=4):
+        """
+        Compare the current weather of several locations in one call.
+
+        Parameters:
+        - locations (list of str): City names (e.g., ["Tokyo", "Berlin", "Walnut Creek, US"]).
+        - unit (str, optional): Unit system to use. Options: "imperial" (Fahrenheit, mph), "metric" (Celsius, m/s), or "standard" (Kelvin, m/s). Default is "imperial".
+        - max_concurrency (int, optional): Number of locations fetched at the same time (1 to 8). Default is 4.
+
+        Returns:
+        - One comparative table with a row per location, followed by how many
+          locations succeeded. A location that could not be fetched is still
+          listed, with its error in the Status column:
+
+            | Location          | Status                    | Conditions    | Temp    | Feels Like   | Humidity   | Wind             |
+            |-------------------|---------------------------|---------------|---------|--------------|------------|------------------|
+            | Tokyo, JP         | ok                        | Few clouds    | 78.1°F  | 79.3°F       | 70%        | 9.2 mph from 180° |
+            | Atlantis          | failed: city not found    |               |         |              |            |                  |
+
+            1 of 2 locations fetched
+        """
+
+        locations = unique_items(locations)
+        if not locations:
+            return False, "No locations provided."
+
+        results = fetch_all(lambda location: self.w_client.get_current_weather(city_name=location, unit=unit),
+                            locations, max_concurrency)
+
+        unit_symbol = self._get_unit_symbol(unit)
+        speed_unit = self._get_speed_unit(unit)
+
+        rows = []
+        succeeded = 0
+
+        for location, (status, output) in zip(locations, results):
+
+            if not status or not isinstance(output, dict):
+                rows.append([location, f"failed: {output}", "", "", "", "", ""])
+                continue
+
+            succeeded += 1
+
+            city = output.get("name") or location
+            country = output.get("sys", {}).get("country", "")
+            main = output.get("main", {})
+            wind = output.get("wind", {})
+            desc = output.get("weather", [{}])[0].get("description", "")
+
+            wind_str = ""
+            if "speed" in wind:
+                wind_str = f"{wind['speed']:.1f} {speed_unit}"
+                if "deg" in wind:
+                    wind_str += f" from {wind['deg']}°"
+
+            rows.append([
+                f"{city}, {country}" if country else city,
+                "ok",
+                desc.capitalize(),
+                f"{main['temp']:.1f}{unit_symbol}" if "temp" in main else "",
+                f"{main['feels_like']:.1f}{unit_symbol}" if "feels_like" in main else "",
+                f"{main['humidity']}%" if "humidity" in main else "",
+                wind_str
+            ])
+
+        headers = ["Location", "Status", "Conditions", "Temp", "Feels Like", "Humidity", "Wind"]
+
+        return succeeded > 0, batch_table(rows, headers, f"{succeeded} of {len(locations)} locations fetched")
+
+
+    @include_as_tool
+    def get_weather_history(self, city_name, start=None, end=None, at=None, unit="imperial"):
+        """
+        Answer questions about past weather of a city ("how did the temperature
+        trend today", "what was it at 9am") from locally recorded observations,
+        without calling the weather API. Only cities queried before (or watched)
+        have history.
+
+        Parameters:
+        - city_name (str): The name of the city (e.g., "Walnut Creek").
+        - start (str, optional): Start of the range in the city's local time, "HH:MM" (today),
+          "YYYY-MM-DD" or "YYYY-MM-DD HH:MM". Default is today at 00:00.
+        - end (str, optional): End of the range, same formats. Default is now.
+        - at (str, optional): A single local time ("09:00" or "YYYY-MM-DD HH:MM"); returns the
+          observation closest to it instead of a range.
+        - unit (str, optional): "imperial" (default), "metric" or "standard".
+
+        Returns:
+        - A trend summary followed by a table of observations (at most 24 rows):
+
+            **Weather history of walnut creek** (2025-08-05 00:00 to 2025-08-05 14:10, local time)
+            - Observations: 15
+            - Temperature: 58.3°F -> 74.1°F, low 56.9°F at 05:50, high 74.1°F at 14:10, mean 64.2°F
+            - Trend: rising 1.2°F/hour
+
+            | Time   | Temp   | Feels Like   | Humidity   | Wind       | Conditions   |
+            |--------|--------|--------------|------------|------------|--------------|
+            | 00:10  | 58.3°F | 57.9°F       | 81%        | 3.1 mph    | Clear sky    |
+        """
+
+        if unit not in UNITS:
+            return False, f"invalid unit '{unit}', expected one of: {', '.join(UNITS)}"
+
+        history = self.w_client.history
+        location = Weather_History.location_key(city_name)
+
+        tz_shift = history.latest_tz_shift(location)
+        if tz_shift is None:
+            return False, f"No recorded observations for '{city_name}'. Ask for its current weather first."
+
+        now_local = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(seconds=tz_shift)
+
+        try:
+            if at is not None:
+                at_ts = self._parse_local_time(at, now_local, tz_shift)
+                rows = history.query(location, at_ts - 3 * 3600, at_ts + 3 * 3600)
+                if not rows:
+                    return False, f"No observation of '{city_name}' within 3 hours of {at}."
+                rows = [min(rows, key=lambda x: abs(x["ts"] - at_ts))]
+                start_ts = end_ts = rows[0]["ts"]
+            else:
+                start_ts = self._parse_local_time(start or "00:00", now_local, tz_shift)
+                end_ts = self._parse_local_time(end, now_local, tz_shift, end_of_day=True) if end \
+                    else int(time.time())
+                rows = history.query(location, start_ts, end_ts)
+        except ValueError as E:
+            return False, str(E)
+
+        if not rows:
+            return False, f"No recorded observations of '{city_name}' in this time range."
+
+        rows = convert_units(rows, unit)
+
+        unit_symbol = self._get_unit_symbol(unit)
+        speed_unit = self._get_speed_unit(unit)
+
+        def local(ts, fmt="%H:%M"):
+            return self._local_time(ts, tz_shift).strftime(fmt)
+
+        ts = np.array([x["ts"] for x in rows], dtype=np.int64)
+        temp = np.array([np.nan if x["temp"] is None else x["temp"] for x in rows], dtype=np.float64)
+
+        parts = [f"**Weather history of {location}** "
+                 f"({local(start_ts, '%Y-%m-%d %H:%M')} to {local(end_ts, '%Y-%m-%d %H:%M')}, local time)",
+                 f"- Observations: {len(rows)}"]
+
+        valid = ~np.isnan(temp)
+        if valid.any():
+            lo = int(np.nanargmin(temp))
+            hi = int(np.nanargmax(temp))
+            first, last = temp[valid][0], temp[valid][-1]
+            parts.append(f"- Temperature: {first:.1f}{unit_symbol} -> {last:.1f}{unit_symbol}, "
+                         f"low {temp[lo]:.1f}{unit_symbol} at {local(ts[lo])}, "
+                         f"high {temp[hi]:.1f}{unit_symbol} at {local(ts[hi])}, "
+                         f"mean {np.nanmean(temp):.1f}{unit_symbol}")
+
+            if valid.sum() >= 2 and ts[valid][-1] > ts[valid][0]:
+                slope = np.polyfit((ts[valid] - ts[valid][0]) / 3600.0, temp[valid], 1)[0]
+                trend = "steady" if abs(slope) < 0.1 else "rising" if slope > 0 else "falling"
+                parts.append(f"- Trend: {trend} {abs(slope):.1f}{unit_symbol}/hour")
+
+        # evenly spaced sample of the observations, always keeping the first and the last
+        if len(rows) > self.MAX_HISTORY_ROWS:
+            picks = np.unique(np.linspace(0, len(rows) - 1, self.MAX_HISTORY_ROWS).round().astype(int))
+            rows = [rows[i] for i in picks]
+
+        table_rows = []
+        for x in rows:
+            table_rows.append([
+                local(x["ts"], "%m-%d %H:%M") if end_ts - start_ts > DAY_SECONDS else local(x["ts"]),
+                f"{x['temp']:.1f}{unit_symbol}" if x["temp"] is not None else "",
+                f"{x['feels_like']:.1f}{unit_symbol}" if x["feels_like"] is not None else "",
+                f"{x['humidity']}%" if x["humidity"] is not None else "",
+                f"{x['wind_speed']:.1f} {speed_unit}" if x["wind_speed"] is not None else "",
+                (x["conditions"] or "").capitalize()
+            ])
+
+        headers = ["Time", "Temp", "Feels Like", "Humidity", "Wind", "Conditions"]
+        parts.append("")
+        parts.append(tabulate(table_rows, headers=headers, tablefmt="github"))
+
+        return True, "\n".join(parts)
+
+
+    def _parse_local_time(self, value: str, now_local: datetime, tz_shift: int, end_of_day=False) -> int:
+        """'HH:MM' (today), 'YYYY-MM-DD' or 'YYYY-MM-DD HH:MM' in the city's local time -> unix time"""
+
+        value = str(value).strip()
+
+        for fmt in ("%H:%M", "%Y-%m-%d %H:%M", "%Y-%m-%dT%H:%M", "%Y-%m-%d"):
+            try:
+                parsed = datetime.strptime(value, fmt)
+                break
+            except ValueError:
+                continue
+        else:
+            raise ValueError(f"invalid time '{value}', expected 'HH:MM', 'YYYY-MM-DD' or 'YYYY-MM-DD HH:MM'")
+
+        if fmt == "%H:%M":
+            parsed = now_local.replace(hour=parsed.hour, minute=parsed.minute, second=0, microsecond=0)
+        elif fmt == "%Y-%m-%d" and end_of_day:
+            parsed = parsed + timedelta(days=1, seconds=-1)
+
+        return int(parsed.replace(tzinfo=timezone.utc).timestamp()) - tz_shift
+
+
     def _get_unit_symbol(self, unit: str) -> str:
 
         return "°F" if unit == "imperial" else "°C" if unit == "metric" else "K"
 
 
+    def _get_speed_unit(self, unit: str) -> str:
+
+        return "mph" if unit == "imperial" else "m/s"
+
+
     @include_as_tool
-    def get_forecast_5day_3hour(self, city_name, unit="imperial"):
+    def get_forecast_5day_3hour(self, city_name, unit="imperial", mode="daily", day=None):
         """
-        Retrieve the 5-day weather forecast in 3-hour intervals for a specific city.
+        Retrieve the 5-day weather forecast (3-hour intervals) for a specific city.
 
         Parameters:
         - city_name (str): The name of the city to retrieve the forecast for (e.g., "Walnut Creek").
@@ -107,22 +340,39 @@ class Weather_Info():
             - "imperial" (default): Temperature in Fahrenheit, wind speed in mph
             - "metric": Temperature in Celsius, wind speed in m/s
             - "standard": Temperature in Kelvin
+        - mode (str, optional):
+            - "daily" (default): one compact row per day (local time of the city)
+            - "slots": one block per 3-hour period (about 40 blocks, verbose)
+        - day (str, optional): Local date "YYYY-MM-DD". Returns the 3-hour blocks of that day only.
 
         Returns:
-        - str: A human-readable multi-block summary of the forecast, with one block per 3-hour period.
+        - mode "daily": a table with low / high / mean temperature, peak gust,
+          dominant condition and precipitation windows of each day:
 
-        --- Forecast #1 ---
-        2025-08-05 03:00:00
+            **5-day forecast for Walnut Creek, US** (local time, UTC-07:00)
 
-        - Weather: Clear sky
-        - Temperature: 70.9°F (Feels like 70.4°F)
-        - Low / High: 70.9°F / 72.6°F
-        - Humidity: 58%
-        - Wind: 8.8 m/s from 200° (gusts up to 12.8 m/s)
-        - Pressure: 1014 hPa (Sea level: 1014 hPa, Ground level: 997 hPa)
-        - Visibility: 10,000 meters
+            | Day            | Conditions   | Low    | High   | Mean   | Peak Gust   | Precipitation              |
+            |----------------|--------------|--------|--------|--------|-------------|----------------------------|
+            | Tue 2025-08-05 | Clear sky    | 58.1°F | 78.0°F | 66.2°F | 12.8 mph    | none                       |
+            | Wed 2025-08-06 | Light rain   | 55.4°F | 70.3°F | 61.9°F | 18.1 mph    | 09:00-15:00 (80%, 2.4 mm)  |
+
+        - mode "slots" or a day: one block per 3-hour period:
+
+            --- Forecast #1 ---
+            2025-08-05 03:00:00
+
+            - Weather: Clear sky
+            - Temperature: 70.9°F (Feels like 70.4°F)
+            - Low / High: 70.9°F / 72.6°F
+            - Humidity: 58%
+            - Wind: 8.8 mph from 200° (gusts up to 12.8 mph)
+            - Pressure: 1014 hPa (Sea level: 1014 hPa, Ground level: 997 hPa)
+            - Visibility: 10,000 meters
         """
 
+        if mode not in ("daily", "slots"):
+            return False, f"invalid mode '{mode}', expected 'daily' or 'slots'"
+
         status, output = self.w_client.get_forecast_5day_3hour(city_name=city_name, unit=unit)
         if not status:
             return False, output
@@ -131,6 +381,16 @@ class Weather_Info():
         if not forecast_list:
             return False, "No forecast data found."
 
+        tz_shift = output.get("city", {}).get("timezone", 0) or 0
+
+        if day is not None:
+            forecast_list = [x for x in forecast_list
+                             if self._local_time(x.get("dt", 0), tz_shift).strftime("%Y-%m-%d") == day]
+            if not forecast_list:
+                return False, f"No forecast data for {day} (the forecast covers the next 5 days)."
+        elif mode == "daily":
+            return True, self._format_forecast_daily(output, unit=unit)
+
         output_blocks = []
 
         for i, forecast in enumerate(forecast_list):
@@ -140,6 +400,107 @@ class Weather_Info():
         return True, "\n\n".join(output_blocks)
 
 
+    def _local_time(self, dt: int, tz_shift: int) -> datetime:
+
+        return datetime.fromtimestamp(dt + tz_shift, tz=timezone.utc)
+
+
+    def _format_forecast_daily(self, data: dict, unit: str = "imperial") -> str:
+        """
+        Aggregate the 3-hour slots into one row per local day.
+
+        The slots are loaded into NumPy columns once; the per-day min / max /
+        mean / peak reductions and the precipitation windows are computed over
+        the whole columns with reduceat, since the slots are ordered by time
+        and each day is a contiguous run.
+        """
+
+        slots = data.get("list", [])
+        city = data.get("city", {})
+        tz_shift = city.get("timezone", 0) or 0
+
+        unit_symbol = self._get_unit_symbol(unit)
+        speed_unit = self._get_speed_unit(unit)
+
+        dt = np.array([x.get("dt", 0) for x in slots], dtype=np.int64)
+        temp = np.array([x.get("main", {}).get("temp", np.nan) for x in slots], dtype=np.float64)
+        temp_min = np.array([x.get("main", {}).get("temp_min", np.nan) for x in slots], dtype=np.float64)
+        temp_max = np.array([x.get("main", {}).get("temp_max", np.nan) for x in slots], dtype=np.float64)
+        gust = np.array([x.get("wind", {}).get("gust", x.get("wind", {}).get("speed", np.nan)) for x in slots], dtype=np.float64)
+        pop = np.array([x.get("pop", 0.0) for x in slots], dtype=np.float64)
+        precip = np.array([x.get("rain", {}).get("3h", 0.0) + x.get("snow", {}).get("3h", 0.0) for x in slots], dtype=np.float64)
+        conditions = np.array([(x.get("weather") or [{}])[0].get("description", "unknown") for x in slots])
+
+        order = np.argsort(dt, kind="stable")
+        dt, temp, temp_min, temp_max, gust, pop, precip, conditions = (
+            a[order] for a in (dt, temp, temp_min, temp_max, gust, pop, precip, conditions))
+
+        # local day number of each slot, and where each day starts
+        local = dt + tz_shift
+        day_number = local // 86400
+        starts = np.flatnonzero(np.r_[True, day_number[1:] != day_number[:-1]])
+        counts = np.diff(np.r_[starts, len(dt)])
+
+        day_low = np.fmin.reduceat(temp_min, starts)
+        day_high = np.fmax.reduceat(temp_max, starts)
+        day_mean = np.add.reduceat(np.nan_to_num(temp), starts) / np.maximum(np.add.reduceat(~np.isnan(temp), starts), 1)
+        day_gust = np.fmax.reduceat(gust, starts)
+
+        # precipitation windows: runs of wet slots, broken at day boundaries
+        wet = (pop >= self.PRECIP_POP_THRESHOLD) | (precip > 0)
+        new_day = np.r_[True, day_number[1:] != day_number[:-1]]
+        run_start = wet & (new_day | ~np.r_[False, wet[:-1]])
+        run_starts = np.flatnonzero(run_start)
+        run_lengths = np.add.reduceat(wet, run_starts) if len(run_starts) else np.array([], dtype=np.int64)
+        run_pop = np.fmax.reduceat(np.where(wet, pop, 0.0), run_starts) if len(run_starts) else np.array([])
+        run_mm = np.add.reduceat(np.where(wet, precip, 0.0), run_starts) if len(run_starts) else np.array([])
+        run_day = np.searchsorted(starts, run_starts, side="right") - 1
+
+        windows = [[] for _ in starts]
+        for i, s in enumerate(run_starts):
+            begin = local[s] % 86400
+            end = begin + int(run_lengths[i]) * 3 * 3600
+            end = min(end, 86400)
+            # minutes too: slots of half- and quarter-hour zones do not start on the hour
+            text = (f"{begin // 3600:02d}:{begin % 3600 // 60:02d}-"
+                    f"{end // 3600:02d}:{end % 3600 // 60:02d} ({run_pop[i] * 100:.0f}%")
+            text += f", {run_mm[i]:.1f} mm)" if run_mm[i] > 0 else ")"
+            windows[run_day[i]].append(text)
+
+        rows = []
+
+        for d, (s, n) in enumerate(zip(starts, counts)):
+
+            # dominant condition: the most frequent one of the day (earliest on a tie)
+            names, first, freq = np.unique(conditions[s:s + n], return_index=True, return_counts=True)
+            dominant = names[np.lexsort((first, -freq))[0]]
+
+            label = self._local_time(int(dt[s]), tz_shift).strftime("%a %Y-%m-%d")
+            if n < 8:
+                label += f" ({n} slots)"
+
+            rows.append([
+                label,
+                str(dominant).capitalize(),
+                f"{day_low[d]:.1f}{unit_symbol}",
+                f"{day_high[d]:.1f}{unit_symbol}",
+                f"{day_mean[d]:.1f}{unit_symbol}",
+                f"{day_gust[d]:.1f} {speed_unit}" if not np.isnan(day_gust[d]) else "N/A",
+                ", ".join(windows[d]) or "none"
+            ])
+
+        name = city.get("name", "")
+        country = city.get("country", "")
+        sign = "+" if tz_shift >= 0 else "-"
+        offset = f"UTC{sign}{abs(tz_shift) // 3600:02d}:{abs(tz_shift) % 3600 // 60:02d}"
+
+        headers = ["Day", "Conditions", "Low", "High", "Mean", "Peak Gust", "Precipitation"]
+        table = tabulate(rows, headers=headers, tablefmt="github")
+
+        return (f"**5-day forecast for {name}, {country}** (local time, {offset})\n\n{table}\n\n"
+                f"Use day='YYYY-MM-DD' for the 3-hour detail of one day.")
+
+
     def _format_weather_block_5day_3hour(self, entry: dict, unit: str = "imperial"):
 
         dt_txt = entry.get("dt_txt", "")
@@ -149,6 +510,7 @@ class Weather_Info():
         visibility = entry.get("visibility")
 
         unit_symbol = self._get_unit_symbol(unit)
+        speed_unit = self._get_speed_unit(unit)
         desc = weather_list[0].get("description", "").capitalize() if weather_list else "Unknown"
 
         parts = [f"{dt_txt}", "", f"- Weather: {desc}"]
@@ -159,11 +521,11 @@ class Weather_Info():
         if "humidity" in main:
             parts.append(f"- Humidity: {main['humidity']}%")
         if "speed" in wind:
-            wind_str = f"- Wind: {wind['speed']:.1f} m/s"
+            wind_str = f"- Wind: {wind['speed']:.1f} {speed_unit}"
             if "deg" in wind:
                 wind_str += f" from {wind['deg']}°"
             if "gust" in wind:
-                wind_str += f" (gusts up to {wind['gust']:.1f} m/s)"
+                wind_str += f" (gusts up to {wind['gust']:.1f} {speed_unit})"
             parts.append(wind_str)
         if "pressure" in main:
             pressure_str = f"- Pressure: {main['pressure']} hPa"
@@ -181,6 +543,45 @@ class Weather_Info():
         return "\n".join(parts)
 
 
+    @include_as_tool
+    def get_current_conditions(self, city_name=None, unit="imperial"):
+        """
+        Retrieve the current weather conditions for a city, including UV index, dew point and cloud cover.
+        Served from the same One Call snapshot as the hourly and daily forecasts.
+
+        Parameters:
+        - city_name (str, optional): The name of the city (e.g., "Walnut Creek").
+        - unit (str, optional): Unit system to use. Options are:
+            - "imperial" (default): Temperature in Fahrenheit, wind speed in mph
+            - "metric": Temperature in Celsius, wind speed in m/s
+            - "standard": Temperature in Kelvin
+
+        Returns:
+        - str: A human-readable summary of the current conditions.
+
+        2025-08-05 02:00 UTC
+
+        - Weather: Clear sky
+        - Temperature: 68.5°F (Feels like 68.0°F)
+        - Humidity: 62%
+        - Dew Point: 55.0°F
+        - Pressure: 1014 hPa
+        - UV Index: 0.34
+        - Cloud Cover: 0%
+        - Visibility: 10,000 meters
+        - Wind: 9.3 m/s from 209° (gusts up to 12.9 m/s)
+        """
+
+        status, output = self.w_client.get_forecast_current(city_name=city_name, unit=unit)
+        if not status:
+            return False, output
+
+        if not output:
+            return False, "No current conditions found."
+
+        return True, self._format_weather_block_hourly(output, unit=unit)
+
+
     @include_as_tool
     def get_forecast_hourly(self, city_name=None, unit="imperial"):
         """
@@ -232,6 +633,7 @@ class Weather_Info():
 
         # Unit symbol
         unit_symbol = self._get_unit_symbol(unit)
+        speed_unit = self._get_speed_unit(unit)
 
         # Weather description
         weather_list = entry.get("weather", [])
@@ -271,11 +673,11 @@ class Weather_Info():
         if visibility is not None:
             parts.append(f"- Visibility: {visibility:,} meters")
         if wind_speed is not None:
-            wind = f"- Wind: {wind_speed:.1f} m/s"
+            wind = f"- Wind: {wind_speed:.1f} {speed_unit}"
             if wind_deg is not None:
                 wind += f" from {wind_deg}°"
             if wind_gust is not None:
-                wind += f" (gusts up to {wind_gust:.1f} m/s)"
+                wind += f" (gusts up to {wind_gust:.1f} {speed_unit})"
             parts.append(wind)
 
         return "\n".join(parts)
@@ -350,6 +752,7 @@ class Weather_Info():
 
         # Unit symbol
         unit_symbol = self._get_unit_symbol(unit)
+        speed_unit = self._get_speed_unit(unit)
 
         # Weather description
         weather_list = entry.get("weather", [])
@@ -384,11 +787,11 @@ class Weather_Info():
         wind_gust = entry.get("wind_gust")
 
         if wind_speed is not None:
-            wind_str = f"- Wind: {wind_speed:.1f} m/s"
+            wind_str = f"- Wind: {wind_speed:.1f} {speed_unit}"
             if wind_deg is not None:
                 wind_str += f" from {wind_deg}°"
             if wind_gust is not None:
-                wind_str += f" (gusts up to {wind_gust:.1f} m/s)"
+                wind_str += f" (gusts up to {wind_gust:.1f} {speed_unit})"
             parts.append(wind_str)
 
         return "\n".join(parts)